@@ -0,0 +1,204 @@
+import argparse
+import json
+import sys
+from functools import partial
+from typing import Dict, Iterator, Optional, TextIO, Tuple
+
+from models import Component, GradeScale, Subject, Semester
+from calculator import create_default_grade_scale, generate_semester_summary
+from parallel import DEFAULT_CHUNK_SIZE, parallel_map
+from serialization import dumps_summary
+from profiling import stage
+
+# Errors that mean "this record is bad", as opposed to a bug in the calculator
+RECORD_ERRORS = (ValueError, TypeError, KeyError, ArithmeticError)
+
+
+def component_from_dict(data: Dict) -> Component:
+    """Build a Component from a record using the same keys as the summary output"""
+    return Component(
+        str(data["name"]),
+        float(data["weight"]),
+        float(data["max_marks"]),
+        float(data["my_marks"]),
+        float(data["class_avg_marks"])
+    )
+
+
+def subject_from_dict(data: Dict) -> Subject:
+    """Build a Subject and its components from a record"""
+    return Subject(
+        str(data["name"]),
+        float(data["credit_hours"]),
+        [component_from_dict(comp) for comp in data.get("components", [])]
+    )
+
+
+def semester_from_dict(data: Dict) -> Semester:
+    """Build a Semester from a record shaped like generate_semester_summary output"""
+    if not isinstance(data, dict):
+        raise ValueError("Semester record must be a JSON object")
+    previous_cgpa = data.get("previous_cgpa")
+    previous_credits = data.get("previous_credits")
+    return Semester(
+        str(data.get("name", "")),
+        [subject_from_dict(subject) for subject in data.get("subjects", [])],
+        float(previous_cgpa) if previous_cgpa is not None else None,
+        float(previous_credits) if previous_credits is not None else None
+    )
+
+
+def semester_to_dict(semester: Semester) -> Dict:
+    """Inverse of semester_from_dict"""
+    return {
+        "name": semester.name,
+        "previous_cgpa": semester.previous_cgpa,
+        "previous_credits": semester.previous_credits,
+        "subjects": [
+            {
+                "name": subject.name,
+                "credit_hours": subject.credit_hours,
+                "components": [
+                    {"name": comp.name, "weight": comp.weight, "max_marks": comp.max_marks,
+                     "my_marks": comp.my_marks, "class_avg_marks": comp.class_avg_marks}
+                    for comp in subject.components
+                ]
+            }
+            for subject in semester.subjects
+        ]
+    }
+
+
+def grade_scale_from_dict(data: Dict) -> GradeScale:
+    """Build a GradeScale from {"<threshold>": ["<grade>", <points>], ...}"""
+    if not isinstance(data, dict):
+        raise ValueError("Grade scale must be a JSON object")
+    if not data:
+        raise ValueError("Grade scale must have at least one grade")
+    return GradeScale({
+        float(threshold): (str(grade), float(points))
+        for threshold, (grade, points) in data.items()
+    })
+
+
+def iter_records(stream: TextIO) -> Iterator[Tuple[int, str]]:
+    """Yield (line_number, line) for every non-blank line without reading ahead"""
+    for line_number, line in enumerate(stream, 1):
+        if line.strip():
+            yield line_number, line
+
+
+# One summary cache per process, shared by every chunk that process handles
+_summary_cache = None
+
+
+def _process_cache(size: int):
+    global _summary_cache
+    if _summary_cache is None or _summary_cache.maxsize != size:
+        from cache import SummaryCache
+        _summary_cache = SummaryCache(size)
+    return _summary_cache
+
+
+def process_record(line: str, grade_scale: GradeScale, cache=None) -> Dict:
+    """Turn one JSON line into its semester summary, optionally through a SummaryCache"""
+    with stage("parse"):
+        data = json.loads(line)
+    with stage("build models"):
+        semester = semester_from_dict(data)
+    with stage("summary"):
+        if cache is not None:
+            return cache.semester_summary(semester, grade_scale)
+        return generate_semester_summary(semester, grade_scale)
+
+
+def summarize_line(item: Tuple[int, str], grade_scale: GradeScale, tabular: bool = False,
+                   backend: str = "auto", cache_size: int = 0) -> Tuple[Optional[str], Optional[str]]:
+    """Process one numbered input line into (output_line, error_line); exactly one is set"""
+    line_number, line = item
+    try:
+        summary = process_record(line, grade_scale, _process_cache(cache_size) if cache_size else None)
+    except RECORD_ERRORS as e:
+        return None, json.dumps({"line": line_number, "error": f"{type(e).__name__}: {e}"}) + "\n"
+    with stage("json dump"):
+        return dumps_summary(summary, tabular=tabular, backend=backend) + "\n", None
+
+
+def run_batch(input_stream: TextIO, output_stream: TextIO, error_stream: TextIO,
+              grade_scale: GradeScale, workers: int = 1,
+              chunk_size: int = DEFAULT_CHUNK_SIZE, tabular: bool = False,
+              backend: str = "auto", cache_size: int = 0) -> Tuple[int, int]:
+    """Summarize every record in input_stream, one JSON line in and one out.
+
+    Records that fail are reported on error_stream as {"line", "error"} objects
+    and skipped. Summaries are written as compact JSON, optionally with
+    components as a header plus rows. With more than one worker, records are processed on a process
+    pool in chunks; output order always follows input order. A cache_size above 0
+    reuses summaries of repeated semesters and subjects within each process.
+    Returns the number of successful and failed records.
+    """
+    succeeded = failed = 0
+    results = parallel_map(
+        partial(summarize_line, grade_scale=grade_scale, tabular=tabular, backend=backend,
+                cache_size=cache_size),
+        iter_records(input_stream), workers, chunk_size
+    )
+    for output_line, error_line in results:
+        if error_line is not None:
+            error_stream.write(error_line)
+            failed += 1
+        else:
+            with stage("write"):
+                output_stream.write(output_line)
+            succeeded += 1
+    return succeeded, failed
+
+
+def _open_text(path: Optional[str], mode: str, default: TextIO) -> TextIO:
+    if path is None or path == "-":
+        return default
+    return open(path, mode, encoding="utf-8")
+
+
+def run_batch_cli(argv=None) -> int:
+    """Run the headless batch mode; returns the process exit status"""
+    parser = argparse.ArgumentParser(
+        prog="main.py --batch",
+        description="Summarize semesters from JSON Lines input, writing one summary per line."
+    )
+    parser.add_argument("input", nargs="?", default="-", help="input JSONL file (default: stdin)")
+    parser.add_argument("-o", "--output", default="-", help="output JSONL file (default: stdout)")
+    parser.add_argument("--errors", default=None, help="file for per-record errors (default: stderr)")
+    parser.add_argument("--grade-scale", default=None,
+                        help='JSON file mapping thresholds to [grade, points], e.g. {"0.2": ["A", 4.0]}')
+    parser.add_argument("--workers", type=int, default=1,
+                        help="worker processes; 0 uses every CPU core (default: 1)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"records per work unit sent to a worker (default: {DEFAULT_CHUNK_SIZE})")
+    parser.add_argument("--tabular", action="store_true",
+                        help="write each subject's components as a header plus rows")
+    parser.add_argument("--serializer", default="auto", choices=["auto", "json", "orjson"],
+                        help="JSON encoder backend (default: orjson if installed, else json)")
+    parser.add_argument("--cache-size", type=int, default=0,
+                        help="summaries kept for repeated semesters and subjects; 0 disables (default: 0)")
+    args = parser.parse_args(argv)
+
+    if args.grade_scale:
+        with open(args.grade_scale, encoding="utf-8") as f:
+            grade_scale = grade_scale_from_dict(json.load(f))
+    else:
+        grade_scale = create_default_grade_scale()
+
+    input_stream = _open_text(args.input, "r", sys.stdin)
+    output_stream = _open_text(args.output, "w", sys.stdout)
+    error_stream = _open_text(args.errors, "w", sys.stderr)
+    try:
+        _, failed = run_batch(input_stream, output_stream, error_stream, grade_scale,
+                              args.workers, args.chunk_size, args.tabular, args.serializer,
+                              args.cache_size)
+    finally:
+        for stream in (input_stream, output_stream, error_stream):
+            if stream not in (sys.stdin, sys.stdout, sys.stderr):
+                stream.close()
+
+    return 1 if failed else 0
@@ -0,0 +1,246 @@
+"""Benchmark the calculator on synthetic cohorts of several sizes.
+
+Usage: python benchmark.py [--scales 100,1000,10000] [--output results.json]
+                           [--compare baseline.json]
+
+Results are written as JSON so runs from different commits can be compared
+with --compare.
+"""
+import argparse
+import json
+import pickle
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+from calculator import create_default_grade_scale, generate_semester_summary
+from serialization import encode_summary
+from synthetic import synthetic_cohort
+
+BENCHMARKS = []
+
+
+def benchmark(name: str):
+    """Register a benchmark.
+
+    The decorated function receives the benchmark context and returns a
+    (setup, run, items) triple: setup() prepares untimed state for one run,
+    run(state) is the timed part and items is the number of units processed.
+    """
+    def register(func: Callable):
+        BENCHMARKS.append((name, func))
+        return func
+    return register
+
+
+class Context:
+    """Data shared by all benchmarks at one scale"""
+    def __init__(self, scale: int, subjects: int, group_counts: Optional[Dict[str, int]], seed: int):
+        self.scale = scale
+        self.grade_scale = create_default_grade_scale()
+        cohort = synthetic_cohort(scale, subjects, group_counts=group_counts, seed=seed)
+        # Unpickling gives each run a fresh, cache-cold copy of the cohort
+        self._pickled_cohort = pickle.dumps(cohort)
+        self.warm_cohort = cohort
+        self.summaries = [generate_semester_summary(s, self.grade_scale) for s in cohort]
+        rng = random.Random(seed)
+        self.relative_values = [rng.uniform(-0.4, 0.4) for _ in range(scale * subjects)]
+
+    def fresh_cohort(self):
+        return pickle.loads(self._pickled_cohort)
+
+
+@benchmark("predict_grade")
+def bench_predict_grade(ctx: Context):
+    def run(_):
+        for value in ctx.relative_values:
+            ctx.grade_scale.predict_grade(value)
+    return (lambda: None), run, len(ctx.relative_values)
+
+
+@benchmark("predict_many")
+def bench_predict_many(ctx: Context):
+    return (lambda: None), (lambda _: ctx.grade_scale.predict_many(ctx.relative_values)), len(ctx.relative_values)
+
+
+@benchmark("sgpa_cgpa_cold")
+def bench_sgpa_cgpa_cold(ctx: Context):
+    def run(cohort):
+        for semester in cohort:
+            semester.calculate_sgpa(ctx.grade_scale)
+            semester.calculate_cgpa(ctx.grade_scale)
+    return ctx.fresh_cohort, run, ctx.scale
+
+
+@benchmark("sgpa_cgpa_warm")
+def bench_sgpa_cgpa_warm(ctx: Context):
+    def run(cohort):
+        for semester in cohort:
+            semester.calculate_sgpa(ctx.grade_scale)
+            semester.calculate_cgpa(ctx.grade_scale)
+    return (lambda: ctx.warm_cohort), run, ctx.scale
+
+
+@benchmark("generate_semester_summary")
+def bench_generate_semester_summary(ctx: Context):
+    def run(cohort):
+        for semester in cohort:
+            generate_semester_summary(semester, ctx.grade_scale)
+    return ctx.fresh_cohort, run, ctx.scale
+
+
+@benchmark("cohort_engine")
+def bench_cohort_engine(ctx: Context):
+    try:
+        from cohort import generate_cohort_summaries
+    except ImportError:
+        return None  # NumPy is not installed
+    return ctx.fresh_cohort, (lambda cohort: generate_cohort_summaries(cohort, ctx.grade_scale)), ctx.scale
+
+
+@benchmark("cohort_evaluate")
+def bench_cohort_evaluate(ctx: Context):
+    """Array evaluation alone, for data that is already columnar"""
+    try:
+        from cohort import CohortTable, evaluate_cohort
+    except ImportError:
+        return None
+    table = CohortTable.from_semesters(ctx.warm_cohort)
+    return (lambda: table), (lambda t: evaluate_cohort(t, ctx.grade_scale)), ctx.scale
+
+
+@benchmark("monte_carlo")
+def bench_monte_carlo(ctx: Context):
+    """One semester with the last component of every subject uncertain"""
+    try:
+        from simulation import UncertainMarks, simulate_semester
+    except ImportError:
+        return None
+    semester = ctx.warm_cohort[0]
+    uncertain = {
+        subject.name: {subject.components[-1].name: UncertainMarks(my_std=5.0, class_avg_std=2.0)}
+        for subject in semester.subjects if subject.components
+    }
+    samples = 10 * ctx.scale
+    return (lambda: None), (lambda _: simulate_semester(semester, ctx.grade_scale, uncertain, samples, seed=0)), samples
+
+
+def _json_benchmark(compact: bool, tabular: bool):
+    def factory(ctx: Context):
+        def run(_):
+            for summary in ctx.summaries:
+                encode_summary(summary, compact=compact, tabular=tabular, backend="json")
+        return (lambda: None), run, ctx.scale
+    return factory
+
+
+benchmark("json_indent")(_json_benchmark(compact=False, tabular=False))
+benchmark("json_compact")(_json_benchmark(compact=True, tabular=False))
+benchmark("json_tabular")(_json_benchmark(compact=True, tabular=True))
+
+
+def run_benchmarks(scales: List[int], subjects: int = 5, group_counts: Optional[Dict[str, int]] = None,
+                   repeat: int = 3, seed: int = 0, only: Optional[List[str]] = None) -> List[Dict]:
+    """Run every registered benchmark at every scale, keeping the best of repeat runs"""
+    results = []
+    for scale in scales:
+        ctx = Context(scale, subjects, group_counts, seed)
+        for name, factory in BENCHMARKS:
+            if only and name not in only:
+                continue
+            spec = factory(ctx)
+            if spec is None:
+                continue
+            setup, run, items = spec
+            best = float("inf")
+            for _ in range(repeat):
+                state = setup()
+                start = time.perf_counter()
+                run(state)
+                best = min(best, time.perf_counter() - start)
+            results.append({
+                "benchmark": name,
+                "scale": scale,
+                "items": items,
+                "seconds": best,
+                "per_item_us": best / items * 1e6 if items else 0.0
+            })
+            print(f"{name:<28} {scale:>8} {best * 1000:>12.2f}ms {results[-1]['per_item_us']:>10.2f}us/item",
+                  file=sys.stderr)
+    return results
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare_results(baseline: Dict, current: Dict):
+    """Print current timings relative to a baseline results file"""
+    old = {(r["benchmark"], r["scale"]): r["seconds"] for r in baseline["results"]}
+    print(f"{'Benchmark':<28} {'Scale':>8} {'Baseline':>12} {'Current':>12} {'Speedup':>8}")
+    for r in current["results"]:
+        before = old.get((r["benchmark"], r["scale"]))
+        if before is None:
+            continue
+        print(f"{r['benchmark']:<28} {r['scale']:>8} {before * 1000:>10.2f}ms "
+              f"{r['seconds'] * 1000:>10.2f}ms {before / r['seconds']:>7.2f}x")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the calculator on synthetic cohorts.")
+    parser.add_argument("--scales", default="100,1000,10000",
+                        help="comma-separated cohort sizes in semesters (default: 100,1000,10000)")
+    parser.add_argument("--subjects", type=int, default=5, help="subjects per semester (default: 5)")
+    parser.add_argument("--group-count", action="append", default=[], metavar="GROUP=COUNT",
+                        help="override a preset group's component count, e.g. 'Lab Reports=12'")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per benchmark, best is kept (default: 3)")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the synthetic data (default: 0)")
+    parser.add_argument("--only", action="append", default=None, help="run only this benchmark (repeatable)")
+    parser.add_argument("--output", default=None, help="write results JSON here (default: stdout)")
+    parser.add_argument("--compare", default=None, help="baseline results JSON to compare against")
+    args = parser.parse_args(argv)
+
+    group_counts = {}
+    for item in args.group_count:
+        group, _, count = item.rpartition("=")
+        group_counts[group] = int(count)
+
+    results = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "subjects": args.subjects,
+            "group_counts": group_counts,
+            "repeat": args.repeat,
+            "seed": args.seed
+        },
+        "results": run_benchmarks(
+            [int(scale) for scale in args.scales.split(",")],
+            args.subjects, group_counts or None, args.repeat, args.seed, args.only
+        )
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare_results(json.load(f), results)
+
+
+if __name__ == "__main__":
+    main()
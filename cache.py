@@ -0,0 +1,101 @@
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+from models import GradeScale, Subject, Semester
+from calculator import generate_semester_summary, generate_subject_summary
+
+DEFAULT_CACHE_SIZE = 256
+
+
+def subject_key(subject: Subject) -> Tuple:
+    """Hashable key of a subject and its components; equal keys mean equal summaries"""
+    # One flat tuple per subject: nested tuples would each be another object for the garbage collector
+    key = [subject.name, subject.credit_hours]
+    for comp in subject.components:
+        key += (comp.name, comp.weight, comp.max_marks, comp.my_marks, comp.class_avg_marks)
+    return tuple(key)
+
+
+def grade_scale_key(grade_scale: GradeScale) -> Tuple:
+    """Hashable key of a grade scale's thresholds"""
+    return tuple(sorted(grade_scale.thresholds.items()))
+
+
+class SummaryCache:
+    """LRU cache of semester and subject summaries keyed by their contents.
+
+    Entries for whole semesters and for single subjects share one size bound, so
+    editing one subject still reuses the cached summaries of the others. Cached
+    summaries are shared between callers and must be treated as read-only.
+    Safe to use from several threads.
+    """
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._scale = None  # (compiled scale, its key), to build each scale's key once
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def _get(self, key: Tuple) -> Optional[Dict]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            return value
+
+    def _put(self, key: Tuple, value: Dict):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def _scale_key(self, grade_scale: GradeScale) -> Tuple:
+        compiled = grade_scale.compile()
+        scale = self._scale
+        if scale is None or scale[0] is not compiled:
+            scale = (compiled, grade_scale_key(grade_scale))
+            self._scale = scale
+        return scale[1]
+
+    def subject_summary(self, subject: Subject, grade_scale: GradeScale) -> Dict:
+        """generate_subject_summary, served from the cache when the subject is unchanged"""
+        return self._subject_summary(subject_key(subject), subject, grade_scale)
+
+    def _subject_summary(self, key: Tuple, subject: Subject, grade_scale: GradeScale) -> Dict:
+        key = ("subject", key, self._scale_key(grade_scale))
+        summary = self._get(key)
+        if summary is None:
+            summary = generate_subject_summary(subject, grade_scale)
+            self._put(key, summary)
+        return summary
+
+    def semester_summary(self, semester: Semester, grade_scale: GradeScale,
+                         progress: Optional[Callable[[int, int], None]] = None) -> Dict:
+        """generate_semester_summary, served from the cache when the semester is unchanged"""
+        subject_keys = [subject_key(subject) for subject in semester.subjects]
+        key = ("semester", semester.name, semester.previous_cgpa, semester.previous_credits,
+               tuple(subject_keys), self._scale_key(grade_scale))
+        summary = self._get(key)
+        if summary is None:
+            # Subjects are summarized in order, so each reuses the key computed above
+            keys = iter(subject_keys)
+            summary = generate_semester_summary(
+                semester, grade_scale, progress,
+                summarize_subject=lambda subject, scale: self._subject_summary(next(keys), subject, scale)
+            )
+            self._put(key, summary)
+        return summary
@@ -1,4 +1,4 @@
-from typing import Dict
+from typing import Callable, Dict, Optional
 
 from models import GradeScale, Subject, Semester
 
@@ -19,7 +19,7 @@ def create_default_grade_scale() -> GradeScale:
 
 def generate_subject_summary(subject: Subject, grade_scale: GradeScale) -> Dict:
     """Generate a summary dictionary for a subject with all relevant calculations"""
-    grade_letter, grade_points = grade_scale.predict_grade(subject.overall_relative_performance)
+    grade_letter, grade_points = subject.predict_grade(grade_scale)
     
     return {
         "name": subject.name,
@@ -54,17 +54,30 @@ def generate_subject_summary(subject: Subject, grade_scale: GradeScale) -> Dict:
     }
 
 
-def generate_semester_summary(semester: Semester, grade_scale: GradeScale) -> Dict:
-    """Generate a summary dictionary for a semester with all relevant calculations"""
+def generate_semester_summary(semester: Semester, grade_scale: GradeScale,
+                              progress: Optional[Callable[[int, int], None]] = None,
+                              summarize_subject: Callable[[Subject, GradeScale], Dict] = generate_subject_summary) -> Dict:
+    """Generate a summary dictionary for a semester with all relevant calculations.
+
+    If given, progress(done, total) is called after each subject is summarized;
+    raising from it abandons the calculation. summarize_subject replaces
+    generate_subject_summary, e.g. with a cached version.
+    """
+    subjects = []
+    for subject in semester.subjects:
+        subjects.append(summarize_subject(subject, grade_scale))
+        if progress is not None:
+            progress(len(subjects), len(semester.subjects))
+    
     sgpa = semester.calculate_sgpa(grade_scale)
     cgpa = semester.calculate_cgpa(grade_scale)
     
     return {
         "name": semester.name,
-        "subjects": [generate_subject_summary(subject, grade_scale) for subject in semester.subjects],
+        "subjects": subjects,
         "sgpa": sgpa,
         "cgpa": cgpa if semester.previous_cgpa is not None else None,
-        "total_credits": sum(subject.credit_hours for subject in semester.subjects),
+        "total_credits": semester.total_credits,
         "previous_cgpa": semester.previous_cgpa,
         "previous_credits": semester.previous_credits
     }
@@ -1,8 +1,10 @@
-import json
 from typing import List, Optional
 
 from models import Component, GradeScale, Subject, Semester
 from calculator import create_default_grade_scale, generate_semester_summary
+from serialization import write_summary
+from profiling import stage
+from importer import GradebookImportError, gradebook_columns, import_gradebook_file
 
 
 def get_float_input(prompt: str, min_value: Optional[float] = None, max_value: Optional[float] = None) -> float:
@@ -82,16 +84,42 @@ def create_subject() -> Subject:
     return Subject(name, credit_hours, components)
 
 
+def import_subjects() -> List[Subject]:
+    """Read subjects from a gradebook file, asking again until it imports cleanly"""
+    print("\nColumns: Subject, Credits, then '<component> Max', '<component> Marks' and")
+    print("'<component> Class Avg' for every component of a preset, e.g.:")
+    print(", ".join(gradebook_columns("Standard Academic")[:8]) + ", ...")
+    while True:
+        path = input("Gradebook file (leave empty to skip): ").strip()
+        if not path:
+            return []
+        try:
+            with stage("import"):
+                subjects = import_gradebook_file(path)
+        except GradebookImportError as e:
+            print(f"The gradebook was not imported:\n{e}")
+            continue
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"Failed to read gradebook: {e}")
+            continue
+        print(f"Imported {len(subjects)} subjects.")
+        return subjects
+
+
 def create_semester() -> Semester:
     """Get semester details from the user"""
     print("\n=== New Semester ===")
     name = input("Semester name/number: ")
     
     subjects = []
-    while True:
-        subjects.append(create_subject())
-        if not get_yes_no_input("Add another subject?"):
-            break
+    if get_yes_no_input("Do you want to import subjects from a gradebook CSV file?"):
+        subjects.extend(import_subjects())
+    
+    if not subjects or get_yes_no_input("Add another subject?"):
+        while True:
+            subjects.append(create_subject())
+            if not get_yes_no_input("Add another subject?"):
+                break
     
     previous_cgpa = None
     previous_credits = None
@@ -166,10 +194,9 @@ def customize_grade_scale(grade_scale: GradeScale) -> GradeScale:
         return grade_scale
 
 
-def save_to_file(semester_summary: dict, filename: str):
+def save_to_file(semester_summary: dict, filename: str, compact: bool = False, tabular: bool = False):
     """Save the semester summary to a JSON file"""
-    with open(filename, 'w') as f:
-        json.dump(semester_summary, f, indent=2)
+    write_summary(semester_summary, filename, compact=compact, tabular=tabular)
     print(f"\nSummary saved to {filename}")
 
 
@@ -178,11 +205,17 @@ def run_cli():
     print("Welcome to the Academic Performance Tracker!")
     grade_scale = customize_grade_scale(create_default_grade_scale())
     
-    semester = create_semester()
-    semester_summary = generate_semester_summary(semester, grade_scale)
+    # The input stage includes the time spent waiting for the user
+    with stage("input"):
+        semester = create_semester()
+    with stage("summary"):
+        semester_summary = generate_semester_summary(semester, grade_scale)
     
-    display_semester_summary(semester_summary, grade_scale)
+    with stage("display"):
+        display_semester_summary(semester_summary, grade_scale)
     
     if get_yes_no_input("Do you want to save this summary to a file?"):
         filename = input("Enter filename (default: academic_summary.json): ") or "academic_summary.json"
-        save_to_file(semester_summary, filename)
+        compact = get_yes_no_input("Save as compact JSON (smaller file, no indentation)?")
+        with stage("json dump"):
+            save_to_file(semester_summary, filename, compact=compact)
@@ -0,0 +1,353 @@
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from models import GradeScale, Semester
+
+
+@dataclass
+class CohortTable:
+    """Columnar view of a whole cohort: one row per component, subject and semester.
+
+    Component rows must be grouped by subject and subject rows grouped by semester,
+    in the same order as ``Semester.subjects`` and ``Subject.components``.
+    """
+    # Component columns
+    weight: np.ndarray
+    max_marks: np.ndarray
+    my_marks: np.ndarray
+    class_avg_marks: np.ndarray
+    component_subject: np.ndarray  # Index of the owning subject row
+    # Subject columns
+    credit_hours: np.ndarray
+    subject_semester: np.ndarray  # Index of the owning semester row
+    # Semester columns (NaN where no previous data was given)
+    previous_cgpa: np.ndarray
+    previous_credits: np.ndarray
+    # Names are optional so purely numeric tables can be evaluated too
+    component_names: Optional[List[str]] = None
+    subject_names: Optional[List[str]] = None
+    semester_names: Optional[List[str]] = None
+
+    def __post_init__(self):
+        for name in ("weight", "max_marks", "my_marks", "class_avg_marks",
+                     "credit_hours", "previous_cgpa", "previous_credits"):
+            setattr(self, name, np.asarray(getattr(self, name), dtype=np.float64))
+        self.component_subject = np.asarray(self.component_subject, dtype=np.intp)
+        self.subject_semester = np.asarray(self.subject_semester, dtype=np.intp)
+
+    @property
+    def n_components(self) -> int:
+        return len(self.weight)
+
+    @property
+    def n_subjects(self) -> int:
+        return len(self.credit_hours)
+
+    @property
+    def n_semesters(self) -> int:
+        return len(self.previous_cgpa)
+
+    @classmethod
+    def from_semesters(cls, semesters: Iterable[Semester]) -> "CohortTable":
+        """Flatten a sequence of Semester objects into columns"""
+        weight, max_marks, my_marks, class_avg = [], [], [], []
+        component_subject, component_names = [], []
+        credit_hours, subject_semester, subject_names = [], [], []
+        previous_cgpa, previous_credits, semester_names = [], [], []
+
+        for semester in semesters:
+            semester_index = len(semester_names)
+            semester_names.append(semester.name)
+            previous_cgpa.append(np.nan if semester.previous_cgpa is None else semester.previous_cgpa)
+            previous_credits.append(np.nan if semester.previous_credits is None else semester.previous_credits)
+
+            for subject in semester.subjects:
+                subject_index = len(subject_names)
+                subject_names.append(subject.name)
+                credit_hours.append(subject.credit_hours)
+                subject_semester.append(semester_index)
+
+                for comp in subject.components:
+                    component_names.append(comp.name)
+                    weight.append(comp.weight)
+                    max_marks.append(comp.max_marks)
+                    my_marks.append(comp.my_marks)
+                    class_avg.append(comp.class_avg_marks)
+                    component_subject.append(subject_index)
+
+        return cls(
+            weight=weight,
+            max_marks=max_marks,
+            my_marks=my_marks,
+            class_avg_marks=class_avg,
+            component_subject=component_subject,
+            credit_hours=credit_hours,
+            subject_semester=subject_semester,
+            previous_cgpa=previous_cgpa,
+            previous_credits=previous_credits,
+            component_names=component_names,
+            subject_names=subject_names,
+            semester_names=semester_names,
+        )
+
+
+@dataclass
+class CohortMetrics:
+    """Every Component, Subject and Semester metric of a cohort as arrays"""
+    # Per component
+    my_percentage: np.ndarray
+    class_avg_percentage: np.ndarray
+    weighted_my_score: np.ndarray
+    weighted_class_avg: np.ndarray
+    relative_performance: np.ndarray
+    # Per subject
+    total_my_marks: np.ndarray
+    total_max_marks: np.ndarray
+    total_class_avg_marks: np.ndarray
+    weighted_total_my_score: np.ndarray
+    weighted_total_class_avg: np.ndarray
+    overall_relative_performance: np.ndarray
+    grade_index: np.ndarray  # Index into CompiledGradeScale.grades
+    grade_points: np.ndarray
+    # Per semester
+    total_credits: np.ndarray
+    sgpa: np.ndarray
+    cgpa: np.ndarray  # Equals sgpa where no previous data was given
+
+
+def _grouped_sum(values: np.ndarray, groups: np.ndarray, size: int) -> np.ndarray:
+    """Sum values per group, accumulating in row order like the built-in sum()"""
+    return np.bincount(groups, weights=values, minlength=size)
+
+
+def _safe_ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    """numerator / denominator, or 0 where the denominator is 0"""
+    out = np.zeros_like(numerator)
+    np.divide(numerator, denominator, out=out, where=denominator != 0)
+    return out
+
+
+def evaluate_cohort(table: CohortTable, grade_scale: GradeScale) -> CohortMetrics:
+    """Compute all metrics for a cohort in array operations"""
+    n_subjects = table.n_subjects
+    n_semesters = table.n_semesters
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        my_ratio = table.my_marks / table.max_marks
+        class_ratio = table.class_avg_marks / table.max_marks
+        weighted_my = my_ratio * table.weight
+        weighted_class = class_ratio * table.weight
+        relative = _safe_ratio(table.my_marks - table.class_avg_marks, table.class_avg_marks)
+
+        total_my = _grouped_sum(table.my_marks, table.component_subject, n_subjects)
+        total_max = _grouped_sum(table.max_marks, table.component_subject, n_subjects)
+        total_class = _grouped_sum(table.class_avg_marks, table.component_subject, n_subjects)
+        weighted_total_my = _grouped_sum(weighted_my, table.component_subject, n_subjects)
+        weighted_total_class = _grouped_sum(weighted_class, table.component_subject, n_subjects)
+        overall = _safe_ratio(weighted_total_my - weighted_total_class, weighted_total_class)
+
+        compiled = grade_scale.compile()
+        grade_index = compiled.grade_indices(overall)
+        grade_points = np.array([points for _, points in compiled.grades], dtype=np.float64)[grade_index]
+
+        total_credits = _grouped_sum(table.credit_hours, table.subject_semester, n_semesters)
+        credit_points = _grouped_sum(grade_points * table.credit_hours, table.subject_semester, n_semesters)
+        sgpa = _safe_ratio(credit_points, total_credits)
+
+        has_previous = ~(np.isnan(table.previous_cgpa) | np.isnan(table.previous_credits))
+        cgpa = np.where(
+            has_previous,
+            (table.previous_cgpa * table.previous_credits + sgpa * total_credits)
+            / (table.previous_credits + total_credits),
+            sgpa,
+        )
+
+    return CohortMetrics(
+        my_percentage=my_ratio * 100,
+        class_avg_percentage=class_ratio * 100,
+        weighted_my_score=weighted_my,
+        weighted_class_avg=weighted_class,
+        relative_performance=relative,
+        total_my_marks=total_my,
+        total_max_marks=total_max,
+        total_class_avg_marks=total_class,
+        weighted_total_my_score=weighted_total_my,
+        weighted_total_class_avg=weighted_total_class,
+        overall_relative_performance=overall,
+        grade_index=grade_index,
+        grade_points=grade_points,
+        total_credits=total_credits,
+        sgpa=sgpa,
+        cgpa=cgpa,
+    )
+
+
+def cohort_summaries(table: CohortTable, metrics: CohortMetrics, grade_scale: GradeScale) -> List[Dict]:
+    """Build generate_semester_summary-compatible dicts from evaluated cohort metrics"""
+    letters = [letter for letter, _ in grade_scale.compile().grades]
+
+    # Convert every column to Python floats in one go, then build the dicts by
+    # zipping the columns rather than indexing them element by element
+    relative = metrics.relative_performance
+    component_summaries = [
+        {
+            "name": name,
+            "weight": weight,
+            "my_marks": my_marks,
+            "max_marks": max_marks,
+            "class_avg_marks": class_avg_marks,
+            "my_percentage": my_percentage,
+            "class_avg_percentage": class_avg_percentage,
+            "weighted_my_score": weighted_my_score,
+            "weighted_class_avg": weighted_class_avg,
+            "relative_performance": relative_performance,
+            "relative_performance_percentage": relative_performance_percentage
+        }
+        for (name, weight, my_marks, max_marks, class_avg_marks, my_percentage, class_avg_percentage,
+             weighted_my_score, weighted_class_avg, relative_performance, relative_performance_percentage)
+        in zip(
+            table.component_names or [""] * table.n_components,
+            table.weight.tolist(), table.my_marks.tolist(), table.max_marks.tolist(),
+            table.class_avg_marks.tolist(), metrics.my_percentage.tolist(),
+            metrics.class_avg_percentage.tolist(), metrics.weighted_my_score.tolist(),
+            metrics.weighted_class_avg.tolist(), relative.tolist(), (relative * 100).tolist()
+        )
+    ]
+
+    component_offsets = np.concatenate(
+        ([0], np.cumsum(np.bincount(table.component_subject, minlength=table.n_subjects)))
+    ).tolist()
+    subject_offsets = np.concatenate(
+        ([0], np.cumsum(np.bincount(table.subject_semester, minlength=table.n_semesters)))
+    ).tolist()
+
+    overall = metrics.overall_relative_performance
+    subject_summaries = [
+        {
+            "name": name,
+            "credit_hours": credit_hours,
+            "my_total_raw": total_my,
+            "max_total_raw": total_max,
+            "class_avg_raw": total_class,
+            "my_percentage": (total_my / total_max) * 100 if total_max else 0,
+            "class_avg_percentage": (total_class / total_max) * 100 if total_max else 0,
+            "weighted_my_score": weighted_my,
+            "weighted_class_avg": weighted_class,
+            "relative_performance": relative_performance,
+            "relative_performance_percentage": relative_performance_percentage,
+            "predicted_grade": letters[grade_index],
+            "grade_points": grade_points,
+            "components": component_summaries[start:stop]
+        }
+        for (name, credit_hours, total_my, total_max, total_class, weighted_my, weighted_class,
+             relative_performance, relative_performance_percentage, grade_index, grade_points, start, stop)
+        in zip(
+            table.subject_names or [""] * table.n_subjects,
+            table.credit_hours.tolist(), metrics.total_my_marks.tolist(), metrics.total_max_marks.tolist(),
+            metrics.total_class_avg_marks.tolist(), metrics.weighted_total_my_score.tolist(),
+            metrics.weighted_total_class_avg.tolist(), overall.tolist(), (overall * 100).tolist(),
+            metrics.grade_index.tolist(), metrics.grade_points.tolist(),
+            component_offsets, component_offsets[1:]
+        )
+    ]
+
+    semester_names = table.semester_names or [""] * table.n_semesters
+    sgpa = metrics.sgpa.tolist()
+    cgpa = metrics.cgpa.tolist()
+    total_credits = metrics.total_credits.tolist()
+    previous_cgpa = table.previous_cgpa.tolist()
+    previous_credits = table.previous_credits.tolist()
+
+    summaries = []
+    for m in range(table.n_semesters):
+        has_cgpa = previous_cgpa[m] == previous_cgpa[m]  # False for NaN
+        summaries.append({
+            "name": semester_names[m],
+            "subjects": subject_summaries[subject_offsets[m]:subject_offsets[m + 1]],
+            "sgpa": sgpa[m],
+            "cgpa": cgpa[m] if has_cgpa else None,
+            "total_credits": total_credits[m],
+            "previous_cgpa": previous_cgpa[m] if has_cgpa else None,
+            "previous_credits": previous_credits[m] if previous_credits[m] == previous_credits[m] else None
+        })
+    return summaries
+
+
+def generate_cohort_summaries(semesters: Iterable[Semester], grade_scale: GradeScale) -> List[Dict]:
+    """Vectorized equivalent of calling generate_semester_summary for every semester.
+
+    Flattening the objects and building the output dicts take nearly all of the
+    time; the arithmetic itself is a small share. Data that is already columnar
+    (e.g. a gradebook) is best built into a CohortTable directly and given to
+    evaluate_cohort.
+    """
+    table = CohortTable.from_semesters(semesters)
+    metrics = evaluate_cohort(table, grade_scale)
+    return cohort_summaries(table, metrics, grade_scale)
+
+
+def cohort_marks_needed(table: CohortTable, grade_scale: GradeScale, pending: np.ndarray) -> np.ndarray:
+    """Vectorized Subject.marks_needed for every subject of a cohort.
+
+    pending is a boolean mask over component rows. Returns an array of shape
+    (n_subjects, n_grades), columns ordered like CompiledGradeScale.grades, holding
+    the share of max marks needed on each pending component: 0 where the grade is
+    already secured and inf where it cannot be reached.
+    """
+    pending = np.asarray(pending, dtype=bool)
+    compiled = grade_scale.compile()
+    thresholds = np.asarray(compiled.thresholds, dtype=np.float64)
+    n_subjects = table.n_subjects
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        weighted_my = (table.my_marks / table.max_marks) * table.weight
+        weighted_class = (table.class_avg_marks / table.max_marks) * table.weight
+        known_score = _grouped_sum(np.where(pending, 0.0, weighted_my), table.component_subject, n_subjects)
+        pending_weight = _grouped_sum(np.where(pending, table.weight, 0.0), table.component_subject, n_subjects)
+        class_total = _grouped_sum(weighted_class, table.component_subject, n_subjects)
+
+        shortfall = (1 + thresholds[None, :]) * class_total[:, None] - known_score[:, None]
+        fraction = np.where(
+            shortfall <= 0,
+            0.0,
+            np.where(pending_weight[:, None] > 0, shortfall / pending_weight[:, None], np.inf)
+        )
+
+    # With no class average the relative performance is fixed at 0
+    fraction[class_total == 0] = np.where(thresholds <= 0, 0.0, np.inf)
+    fraction[:, 0] = 0.0
+
+    # The closed form can land a rounding error below a threshold; step those fractions
+    # up until the marks they give actually earn the grade, as Subject.marks_needed does
+    check = (fraction <= 1) & (class_total != 0)[:, None]
+    check[:, 0] = False
+    step = np.spacing(np.where(fraction > 0, fraction, 1.0))
+    while check.any():
+        short = check & (_substituted_relative(table, pending, fraction, class_total) < thresholds)
+        fraction[short] += step[short]
+        step[short] *= 2
+        check = short & (fraction <= 1)
+    return fraction
+
+
+def _substituted_relative(table: CohortTable, pending: np.ndarray, fractions: np.ndarray,
+                          class_total: np.ndarray) -> np.ndarray:
+    """Overall relative performance per subject and grade with pending_marks substituted for the marks"""
+    max_marks = table.max_marks[:, None]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scored = (fractions[table.component_subject] * max_marks / max_marks) * table.weight[:, None]
+        weighted_my = np.where(pending[:, None], scored, ((table.my_marks / table.max_marks) * table.weight)[:, None])
+        totals = np.column_stack([
+            _grouped_sum(weighted_my[:, g], table.component_subject, table.n_subjects)
+            for g in range(fractions.shape[1])
+        ])
+        return (totals - class_total[:, None]) / class_total[:, None]
+
+
+def pending_marks(table: CohortTable, fractions: np.ndarray, pending: np.ndarray) -> np.ndarray:
+    """Marks needed per component row and grade from cohort_marks_needed; NaN for non-pending rows"""
+    marks = fractions[table.component_subject] * table.max_marks[:, None]
+    marks[~np.asarray(pending, dtype=bool)] = np.nan
+    return marks
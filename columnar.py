@@ -0,0 +1,221 @@
+"""Columnar export of semester summaries as one .npy file per column.
+
+Layout of an export directory:
+
+    manifest.json                 row counts and column types of each table
+    strings.json                  string table; string columns hold indices into it
+    semesters/<column>.npy
+    subjects/<column>.npy         "semester" is the row index of the owning semester
+    components/<column>.npy       "subject" is the row index of the owning subject
+
+Missing values (cgpa, previous_cgpa, previous_credits) are stored as NaN.
+"""
+import json
+import os
+from array import array
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from models import GradeScale
+from cohort import CohortMetrics, CohortTable
+from serialization import COMPONENT_FIELDS
+
+FORMAT_VERSION = 1
+
+# (column, type) per table, in file order; "str" columns are indices into strings.json
+SEMESTER_COLUMNS = [
+    ("name", "str"), ("sgpa", "float64"), ("cgpa", "float64"), ("total_credits", "float64"),
+    ("previous_cgpa", "float64"), ("previous_credits", "float64")
+]
+SUBJECT_COLUMNS = [
+    ("semester", "int64"), ("name", "str"), ("credit_hours", "float64"), ("my_total_raw", "float64"),
+    ("max_total_raw", "float64"), ("class_avg_raw", "float64"), ("my_percentage", "float64"),
+    ("class_avg_percentage", "float64"), ("weighted_my_score", "float64"), ("weighted_class_avg", "float64"),
+    ("relative_performance", "float64"), ("relative_performance_percentage", "float64"),
+    ("predicted_grade", "str"), ("grade_points", "float64")
+]
+COMPONENT_COLUMNS = [("subject", "int64"), ("name", "str")] + [
+    (name, "float64") for name in COMPONENT_FIELDS if name != "name"
+]
+TABLES = {"semesters": SEMESTER_COLUMNS, "subjects": SUBJECT_COLUMNS, "components": COMPONENT_COLUMNS}
+
+_TYPECODES = {"float64": "d", "int64": "q", "str": "l"}
+_DTYPES = {"float64": np.float64, "int64": np.int64, "str": np.int32}
+
+
+class _StringTable:
+    def __init__(self):
+        self.strings: List[str] = []
+        self.index: Dict[str, int] = {}
+
+    def code(self, value: str) -> int:
+        code = self.index.get(value)
+        if code is None:
+            code = self.index[value] = len(self.strings)
+            self.strings.append(value)
+        return code
+
+    def codes(self, values: Iterable[str]) -> np.ndarray:
+        return np.fromiter((self.code(value) for value in values), dtype=np.int32)
+
+
+def _write_columns(directory: str, tables: Dict[str, Dict[str, np.ndarray]], strings: List[str]):
+    manifest = {"version": FORMAT_VERSION, "tables": {}}
+    for table, columns in TABLES.items():
+        os.makedirs(os.path.join(directory, table), exist_ok=True)
+        rows = None
+        for column, kind in columns:
+            data = np.ascontiguousarray(tables[table][column], dtype=_DTYPES[kind])
+            rows = len(data)
+            np.save(os.path.join(directory, table, column + ".npy"), data, allow_pickle=False)
+        manifest["tables"][table] = {"rows": rows or 0, "columns": dict(columns)}
+
+    with open(os.path.join(directory, "strings.json"), "w", encoding="utf-8") as f:
+        json.dump(strings, f)
+    with open(os.path.join(directory, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+
+def _none_to_nan(value: Optional[float]) -> float:
+    return np.nan if value is None else value
+
+
+def write_columnar(summaries: Iterable[Dict], directory: str):
+    """Export generate_semester_summary dicts to a columnar directory.
+
+    Values are gathered in compact typed buffers, so summaries can be a
+    generator over a cohort that never exists as a list of dicts.
+    """
+    strings = _StringTable()
+    buffers = {
+        table: {column: array(_TYPECODES[kind]) for column, kind in columns}
+        for table, columns in TABLES.items()
+    }
+    semesters, subjects, components = buffers["semesters"], buffers["subjects"], buffers["components"]
+    semester_index = subject_index = 0
+
+    for summary in summaries:
+        semesters["name"].append(strings.code(summary["name"]))
+        for column in ("sgpa", "cgpa", "total_credits", "previous_cgpa", "previous_credits"):
+            semesters[column].append(_none_to_nan(summary[column]))
+
+        for subject in summary["subjects"]:
+            subjects["semester"].append(semester_index)
+            for column, kind in SUBJECT_COLUMNS[1:]:
+                value = subject[column]
+                subjects[column].append(strings.code(value) if kind == "str" else value)
+
+            for comp in subject["components"]:
+                components["subject"].append(subject_index)
+                components["name"].append(strings.code(comp["name"]))
+                for column, _ in COMPONENT_COLUMNS[2:]:
+                    components[column].append(comp[column])
+            subject_index += 1
+        semester_index += 1
+
+    _write_columns(directory, {
+        table: {column: np.frombuffer(data, dtype=data.typecode) if len(data) else np.array([])
+                for column, data in columns.items()}
+        for table, columns in buffers.items()
+    }, strings.strings)
+
+
+def write_cohort_columnar(table: CohortTable, metrics: CohortMetrics, grade_scale: GradeScale, directory: str):
+    """Export an evaluated cohort straight from its arrays, without building summary dicts"""
+    strings = _StringTable()
+    letters = [letter for letter, _ in grade_scale.compile().grades]
+    letter_codes = strings.codes(letters)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        has_max = metrics.total_max_marks != 0
+        subject_my_pct = np.where(has_max, metrics.total_my_marks / metrics.total_max_marks * 100, 0.0)
+        subject_class_pct = np.where(has_max, metrics.total_class_avg_marks / metrics.total_max_marks * 100, 0.0)
+
+    # As in generate_semester_summary: cgpa is reported whenever a previous CGPA was
+    # given, and equals the SGPA when previous credits are missing
+    has_cgpa = ~np.isnan(table.previous_cgpa)
+    _write_columns(directory, {
+        "semesters": {
+            "name": strings.codes(table.semester_names or [""] * table.n_semesters),
+            "sgpa": metrics.sgpa,
+            "cgpa": np.where(has_cgpa, metrics.cgpa, np.nan),
+            "total_credits": metrics.total_credits,
+            "previous_cgpa": table.previous_cgpa,
+            "previous_credits": table.previous_credits,
+        },
+        "subjects": {
+            "semester": table.subject_semester,
+            "name": strings.codes(table.subject_names or [""] * table.n_subjects),
+            "credit_hours": table.credit_hours,
+            "my_total_raw": metrics.total_my_marks,
+            "max_total_raw": metrics.total_max_marks,
+            "class_avg_raw": metrics.total_class_avg_marks,
+            "my_percentage": subject_my_pct,
+            "class_avg_percentage": subject_class_pct,
+            "weighted_my_score": metrics.weighted_total_my_score,
+            "weighted_class_avg": metrics.weighted_total_class_avg,
+            "relative_performance": metrics.overall_relative_performance,
+            "relative_performance_percentage": metrics.overall_relative_performance * 100,
+            "predicted_grade": letter_codes[metrics.grade_index],
+            "grade_points": metrics.grade_points,
+        },
+        "components": {
+            "subject": table.component_subject,
+            "name": strings.codes(table.component_names or [""] * table.n_components),
+            "weight": table.weight,
+            "my_marks": table.my_marks,
+            "max_marks": table.max_marks,
+            "class_avg_marks": table.class_avg_marks,
+            "my_percentage": metrics.my_percentage,
+            "class_avg_percentage": metrics.class_avg_percentage,
+            "weighted_my_score": metrics.weighted_my_score,
+            "weighted_class_avg": metrics.weighted_class_avg,
+            "relative_performance": metrics.relative_performance,
+            "relative_performance_percentage": metrics.relative_performance * 100,
+        },
+    }, strings.strings)
+
+
+class ColumnarSummaries:
+    """Read-only, memory-mapped access to a columnar export.
+
+    Columns are opened lazily with np.load(mmap_mode="r"), so scanning one
+    column of millions of rows only pages in that column.
+    """
+    def __init__(self, directory: str):
+        self.directory = directory
+        with open(os.path.join(directory, "manifest.json"), encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported columnar format version: {self.manifest.get('version')}")
+        with open(os.path.join(directory, "strings.json"), encoding="utf-8") as f:
+            self.strings: List[str] = json.load(f)
+        self._columns: Dict[tuple, np.ndarray] = {}
+
+    def rows(self, table: str) -> int:
+        return self.manifest["tables"][table]["rows"]
+
+    def columns(self, table: str) -> List[str]:
+        return list(self.manifest["tables"][table]["columns"])
+
+    def column(self, table: str, name: str) -> np.ndarray:
+        """A memory-mapped column; string columns are returned as indices into self.strings"""
+        key = (table, name)
+        data = self._columns.get(key)
+        if data is None:
+            if name not in self.manifest["tables"][table]["columns"]:
+                raise KeyError(f"No column {name!r} in {table}")
+            if self.rows(table) == 0:
+                data = np.empty(0, dtype=_DTYPES[self.manifest["tables"][table]["columns"][name]])
+            else:
+                data = np.load(os.path.join(self.directory, table, name + ".npy"), mmap_mode="r")
+            self._columns[key] = data
+        return data
+
+    def text(self, table: str, name: str, rows=None) -> List[str]:
+        """Decode a string column, or the selected rows of it"""
+        codes = self.column(table, name)
+        if rows is not None:
+            codes = codes[rows]
+        return [self.strings[code] for code in codes.tolist()]
@@ -0,0 +1,77 @@
+"""Check that the scalar and vectorized calculations agree on a synthetic cohort.
+
+Usage: python consistency_check.py [--semesters N] [--seed SEED]
+
+Subject.marks_needed is run with pending components given as positions,
+negative positions, names and duplicates, and compared with cohort_marks_needed
+on the same components. Exit status is 1 when any result differs.
+"""
+import argparse
+import math
+import random
+import sys
+
+import numpy as np
+
+from calculator import create_default_grade_scale
+from cohort import CohortTable, cohort_marks_needed
+from synthetic import synthetic_cohort
+
+
+def _pending_spec(rng: random.Random, subject, chosen):
+    """The same pending components written in a random mix of forms"""
+    count = len(subject.components)
+    spec = []
+    for index in chosen:
+        form = rng.randrange(3)
+        if form == 0:
+            spec.append(index)
+        elif form == 1:
+            spec.append(index - count)
+        else:
+            spec.append(subject.components[index].name)
+        if rng.random() < 0.2:
+            spec.append(spec[-1])  # Duplicates must not count twice
+    return spec
+
+
+def check_marks_needed(semesters: int = 300, seed: int = 0) -> int:
+    """Return the number of subjects whose scalar and vectorized results differ"""
+    rng = random.Random(seed)
+    grade_scale = create_default_grade_scale()
+    cohort = synthetic_cohort(semesters, seed=seed)
+    table = CohortTable.from_semesters(cohort)
+    subjects = [subject for semester in cohort for subject in semester.subjects]
+
+    pending = np.zeros(table.n_components, dtype=bool)
+    specs = []
+    offset = 0
+    for subject in subjects:
+        # Names must be unique for a name to pick out one component
+        names = [comp.name for comp in subject.components]
+        candidates = [i for i, name in enumerate(names) if names.count(name) == 1]
+        chosen = [i for i in candidates if rng.random() < 0.4]
+        pending[[offset + i for i in chosen]] = True
+        specs.append(_pending_spec(rng, subject, chosen))
+        offset += len(subject.components)
+
+    fractions = cohort_marks_needed(table, grade_scale, pending)
+    mismatches = 0
+    for row, (subject, spec) in enumerate(zip(subjects, specs)):
+        # marks_needed lists the best grade first; the table's columns run lowest first
+        scalar = [result.fraction for result in reversed(subject.marks_needed(grade_scale, spec))]
+        if not all(a == b or math.isclose(a, b, rel_tol=1e-12) for a, b in zip(scalar, fractions[row].tolist())):
+            mismatches += 1
+            if mismatches <= 5:
+                print(f"{subject.name}: pending {spec}: {scalar} != {fractions[row].tolist()}")
+    return mismatches
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare scalar and vectorized calculations.")
+    parser.add_argument("--semesters", type=int, default=300, help="synthetic semesters (default: 300)")
+    parser.add_argument("--seed", type=int, default=0, help="random seed (default: 0)")
+    args = parser.parse_args()
+    mismatches = check_marks_needed(args.semesters, args.seed)
+    print(f"marks_needed: {mismatches} mismatched subjects")
+    sys.exit(1 if mismatches else 0)
@@ -0,0 +1,294 @@
+"""Read large delimited gradebook exports without a Python object per cell.
+
+The file is memory-mapped and parsed in chunks of whole lines. Text columns
+(semester, subject and component names) are sliced out using the separator
+positions found with NumPy, and the numeric columns of the whole chunk are
+parsed in a single np.loadtxt call. Quoted fields are not supported.
+"""
+import io
+import mmap
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+from models import Component, Subject, Semester
+from cohort import CohortTable
+
+# Bytes of the file parsed at a time; bounds memory for multi-gigabyte files
+DEFAULT_CHUNK_BYTES = 16 << 20
+
+
+@dataclass
+class ColumnMapping:
+    """Header names of the gradebook columns; one row per component"""
+    subject: str
+    weight: str
+    max_marks: str
+    my_marks: str
+    class_avg_marks: str
+    component: Optional[str] = None  # Component names are left empty without it
+    credit_hours: Optional[str] = None  # Uses the reader's default credit hours without it
+    semester: Optional[str] = None  # All rows form one semester without it
+
+    def text_columns(self) -> Dict[str, str]:
+        return {key: column for key, column in
+                (("semester", self.semester), ("subject", self.subject), ("component", self.component))
+                if column is not None}
+
+    def numeric_columns(self) -> Dict[str, str]:
+        columns = {"weight": self.weight, "max_marks": self.max_marks,
+                   "my_marks": self.my_marks, "class_avg_marks": self.class_avg_marks}
+        if self.credit_hours is not None:
+            columns["credit_hours"] = self.credit_hours
+        return columns
+
+
+@dataclass
+class GradebookChunk:
+    """Parsed rows of one chunk: text columns as lists of raw bytes, numeric columns as arrays"""
+    text: Dict[str, List[bytes]]
+    numeric: Dict[str, np.ndarray]
+
+    def __len__(self) -> int:
+        return len(self.numeric["weight"])
+
+
+class _ChunkParser:
+    def __init__(self, header: List[str], mapping: ColumnMapping, delimiter: str):
+        text = mapping.text_columns()
+        numeric = mapping.numeric_columns()
+        missing = [column for column in list(text.values()) + list(numeric.values()) if column not in header]
+        if missing:
+            raise ValueError(f"Gradebook has no column named {missing[0]!r}")
+
+        self.delimiter = ord(delimiter)
+        self.n_fields = len(header)
+        self.text_fields = {key: header.index(column) for key, column in text.items()}
+        numeric_positions = [header.index(column) for column in numeric.values()]
+        self.numeric_keys = [key for _, key in sorted(zip(numeric_positions, numeric))]
+        self.numeric_fields = sorted(numeric_positions)
+        self.numeric_columns = [header[field] for field in self.numeric_fields]
+
+    def parse(self, data: bytes, first_line: int, line_numbers: Optional[List[int]] = None) -> GradebookChunk:
+        """Parse whole lines; line_numbers gives each row's line when blank lines were dropped"""
+        if b'"' in data:
+            raise ValueError(f"Quoted fields are not supported (near line {first_line})")
+        raw = np.frombuffer(b"\n" + data, dtype=np.uint8)
+        # Positions of every newline and separator; each starts the field after it
+        starts = np.flatnonzero((raw == 10) | (raw == self.delimiter))
+        rows = data.count(b"\n") + 1
+        line_starts = starts[::self.n_fields]
+        if len(starts) != rows * self.n_fields or (raw[line_starts] != 10).any():
+            raise ValueError(f"Wrong number of fields in a line near line {first_line}")
+
+        # Field i of a line starts after boundary i and ends before the next one
+        ends = np.append(starts[1:], len(raw)) - 1
+        try:
+            values = np.loadtxt(io.BytesIO(data), dtype=np.float64, delimiter=chr(self.delimiter),
+                                comments=None, quotechar=None, usecols=self.numeric_fields, ndmin=2)
+        except ValueError:
+            self._raise_bad_number(data, starts, ends, first_line, line_numbers)
+        numeric = {key: np.ascontiguousarray(values[:, i]) for i, key in enumerate(self.numeric_keys)}
+        self.check_ranges(numeric, first_line, line_numbers)
+
+        # Only the text cells are sliced out as Python objects; offsets are into data
+        text = {}
+        for key, field in self.text_fields.items():
+            text[key] = list(map(bytes.strip, map(data.__getitem__, map(
+                slice, starts[field::self.n_fields].tolist(), ends[field::self.n_fields].tolist()
+            ))))
+        return GradebookChunk(text, numeric)
+
+    def _raise_bad_number(self, data: bytes, starts: np.ndarray, ends: np.ndarray,
+                          first_line: int, line_numbers: Optional[List[int]]):
+        """Report the first numeric cell that does not parse; only reached on bad input"""
+        starts, ends = starts.tolist(), ends.tolist()
+        for row in range(len(starts) // self.n_fields):
+            for field, column in zip(self.numeric_fields, self.numeric_columns):
+                cell = data[starts[row * self.n_fields + field]:ends[row * self.n_fields + field]]
+                try:
+                    float(cell)
+                except ValueError:
+                    line = line_numbers[row] if line_numbers is not None else first_line + row
+                    raise ValueError(f"Line {line}: {column} must be a number, "
+                                     f"not {cell.strip().decode('utf-8', 'replace')!r}.") from None
+        raise ValueError(f"Non-numeric mark near line {first_line}")
+
+    @staticmethod
+    def check_ranges(numeric: Dict[str, np.ndarray], first_line: int, line_numbers: Optional[List[int]] = None):
+        """Same rules as ComponentDialog, tested on the whole chunk at once; NaN fails every rule"""
+        max_marks, my_marks, class_avg = numeric["max_marks"], numeric["my_marks"], numeric["class_avg_marks"]
+        with np.errstate(invalid="ignore"):
+            rules = [
+                (~(max_marks > 0), "maximum marks must be greater than zero"),
+                (~((my_marks >= 0) & (my_marks <= max_marks)), "marks must be between 0 and {max_marks}"),
+                (~((class_avg >= 0) & (class_avg <= max_marks)), "class average must be between 0 and {max_marks}"),
+                (~np.isfinite(numeric["weight"]), "weight must be a number"),
+            ]
+        bad = np.logical_or.reduce([failed for failed, _ in rules])
+        if not bad.any():
+            return
+        row = int(np.argmax(bad))
+        line = line_numbers[row] if line_numbers is not None else first_line + row
+        message = next(message for failed, message in rules if failed[row])
+        raise ValueError(f"Line {line}: {message.format(max_marks=max_marks[row])}.")
+
+
+def read_chunks(path: str, mapping: ColumnMapping, delimiter: str = ",",
+                chunk_bytes: int = DEFAULT_CHUNK_BYTES) -> Iterator[GradebookChunk]:
+    """Yield the parsed rows of a gradebook file one chunk of whole lines at a time"""
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        header_end = data.find(b"\n")
+        if header_end == -1:
+            header_end = len(data)
+        header = [name.strip() for name in data[:header_end].decode("utf-8-sig").rstrip("\r").split(delimiter)]
+        parser = _ChunkParser(header, mapping, delimiter)
+
+        position = header_end + 1
+        line_number = 2
+        while position < len(data):
+            end = data.rfind(b"\n", position, position + chunk_bytes) if position + chunk_bytes < len(data) else -1
+            if end == -1:
+                # Last chunk, or a single line longer than chunk_bytes
+                end = data.find(b"\n", position + chunk_bytes) if position + chunk_bytes < len(data) else -1
+                if end == -1:
+                    end = len(data)
+            chunk = data[position:end].replace(b"\r", b"")
+            lines = chunk.count(b"\n") + 1
+            # Blank lines, including a trailing newline, are skipped; rows after
+            # a dropped line keep their own line numbers for error messages
+            line_numbers = None
+            if b"\n\n" in chunk or chunk.startswith(b"\n"):
+                line_numbers = [line_number + i for i, line in enumerate(chunk.split(b"\n")) if line]
+                chunk = re.sub(rb"\n{2,}", b"\n", chunk)
+            chunk = chunk.strip(b"\n")
+            if chunk:
+                yield parser.parse(chunk, line_number, line_numbers)
+            line_number += lines
+            position = end + 1
+
+
+class _Codes:
+    """First-seen integer codes for the values of a text column"""
+    def __init__(self):
+        self.index: Dict = {}
+
+    def codes(self, keys: list) -> np.ndarray:
+        index = self.index
+        # dict.fromkeys dedups in first-seen order, so only new distinct keys are looped over
+        for key in dict.fromkeys(keys):
+            if key not in index:
+                index[key] = len(index)
+        return np.fromiter(map(index.__getitem__, keys), dtype=np.intp, count=len(keys))
+
+
+def read_cohort_table(path: str, mapping: ColumnMapping, delimiter: str = ",",
+                      default_credit_hours: float = 3.0,
+                      chunk_bytes: int = DEFAULT_CHUNK_BYTES) -> CohortTable:
+    """Read a gradebook into a CohortTable.
+
+    Rows need not be sorted: components are grouped by (semester, subject) in
+    order of first appearance, keeping file order within each subject. Only the
+    numeric columns and the names are held in memory, never the file itself.
+    """
+    semesters, subject_names, subjects, component_names = _Codes(), _Codes(), _Codes(), _Codes()
+    subject_semester: List[int] = []  # Semester code of each subject code
+    subject_name: List[int] = []  # Name code of each subject code
+    row_subject, row_component = [], []
+    numeric = {key: [] for key in mapping.numeric_columns()}
+
+    for chunk in read_chunks(path, mapping, delimiter, chunk_bytes):
+        rows = len(chunk)
+        semester_codes = semesters.codes(chunk.text.get("semester", [b""] * rows))
+        name_codes = subject_names.codes(chunk.text["subject"])
+        # A subject is a (semester, name) pair; pair the two codes in one integer
+        known = len(subjects.index)
+        subject_codes = subjects.codes(((semester_codes << 32) | name_codes).tolist())
+        if len(subjects.index) > known:
+            codes, first_rows = np.unique(subject_codes, return_index=True)
+            first_rows = first_rows[codes >= known]
+            subject_semester.extend(semester_codes[first_rows].tolist())
+            subject_name.extend(name_codes[first_rows].tolist())
+        row_subject.append(subject_codes)
+        if "component" in chunk.text:
+            row_component.append(component_names.codes(chunk.text["component"]))
+        for key, values in chunk.numeric.items():
+            numeric[key].append(values)
+
+    def concat(parts, dtype=np.float64):
+        return np.concatenate(parts) if parts else np.empty(0, dtype=dtype)
+
+    subject_semester = np.array(subject_semester, dtype=np.intp)
+    # CohortTable needs subjects grouped by semester and components by subject
+    subject_order = np.argsort(subject_semester, kind="stable")
+    renumber = np.empty_like(subject_order)
+    renumber[subject_order] = np.arange(len(subject_order))
+    component_subject = renumber[concat(row_subject, np.intp)]
+    row_order = np.argsort(component_subject, kind="stable")
+    columns = {key: concat(parts)[row_order] for key, parts in numeric.items()}
+    component_subject = component_subject[row_order]
+
+    if "credit_hours" in columns:
+        # Taken from each subject's first row
+        credit_hours = columns["credit_hours"][np.searchsorted(component_subject, np.arange(len(subject_order)))]
+    else:
+        credit_hours = np.full(len(subject_order), default_credit_hours)
+
+    # Only distinct names are decoded
+    decode = lambda codes: [value.decode("utf-8") for value in codes.index]
+    names = decode(component_names)
+    subject_text = decode(subject_names)
+    return CohortTable(
+        weight=columns["weight"],
+        max_marks=columns["max_marks"],
+        my_marks=columns["my_marks"],
+        class_avg_marks=columns["class_avg_marks"],
+        component_subject=component_subject,
+        credit_hours=credit_hours,
+        subject_semester=subject_semester[subject_order],
+        previous_cgpa=np.full(len(semesters.index), np.nan),
+        previous_credits=np.full(len(semesters.index), np.nan),
+        component_names=[names[i] for i in concat(row_component, np.intp)[row_order].tolist()]
+        if row_component else None,
+        subject_names=[subject_text[subject_name[i]] for i in subject_order.tolist()],
+        semester_names=decode(semesters),
+    )
+
+
+def semesters_from_table(table: CohortTable) -> List[Semester]:
+    """Build Semester, Subject and Component objects from a CohortTable"""
+    component_names = table.component_names or [""] * table.n_components
+    subject_names = table.subject_names or [""] * table.n_subjects
+    semester_names = table.semester_names or [""] * table.n_semesters
+    columns = list(zip(component_names, table.weight.tolist(), table.max_marks.tolist(),
+                       table.my_marks.tolist(), table.class_avg_marks.tolist()))
+    component_bounds = np.searchsorted(table.component_subject, np.arange(table.n_subjects + 1)).tolist()
+    subject_bounds = np.searchsorted(table.subject_semester, np.arange(table.n_semesters + 1)).tolist()
+    credit_hours = table.credit_hours.tolist()
+    previous_cgpa = table.previous_cgpa.tolist()
+    previous_credits = table.previous_credits.tolist()
+
+    subjects = [
+        Subject(subject_names[s], credit_hours[s], [
+            Component(*row) for row in columns[component_bounds[s]:component_bounds[s + 1]]
+        ])
+        for s in range(table.n_subjects)
+    ]
+    return [
+        Semester(
+            semester_names[m],
+            subjects[subject_bounds[m]:subject_bounds[m + 1]],
+            previous_cgpa[m] if previous_cgpa[m] == previous_cgpa[m] else None,
+            previous_credits[m] if previous_credits[m] == previous_credits[m] else None
+        )
+        for m in range(table.n_semesters)
+    ]
+
+
+def read_semesters(path: str, mapping: ColumnMapping, delimiter: str = ",",
+                   default_credit_hours: float = 3.0,
+                   chunk_bytes: int = DEFAULT_CHUNK_BYTES) -> List[Semester]:
+    """Read a gradebook into Semester objects, one per distinct semester key"""
+    return semesters_from_table(read_cohort_table(path, mapping, delimiter, default_credit_hours, chunk_bytes))
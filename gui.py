@@ -1,34 +1,18 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-import json
+import copy
 import os
+import queue
+import threading
 from typing import Dict, List, Optional, Tuple
 
 from models import Component, Subject, Semester, GradeScale
 from calculator import create_default_grade_scale, generate_semester_summary
+from serialization import write_summary
+from cache import SummaryCache
+from importer import GradebookImportError, import_gradebook_file
+from presets import SUBJECT_PRESETS
 
-# Define common presets
-SUBJECT_PRESETS = {
-    "Standard Academic": [
-        {"name": "Quizzes", "weight": 10, "count": 4, "is_group": True},
-        {"name": "Assignments", "weight": 10, "count": 2, "is_group": True},
-        {"name": "Mid-Semester Exam", "weight": 30, "count": 1, "is_group": False},
-        {"name": "End-Semester Exam", "weight": 50, "count": 1, "is_group": False},
-    ],
-    "Lab Course": [
-        {"name": "Lab Reports", "weight": 30, "count": 8, "is_group": True},
-        {"name": "Lab Performance", "weight": 30, "count": 1, "is_group": False},
-        {"name": "Lab Project", "weight": 20, "count": 1, "is_group": False},
-        {"name": "Lab Exam", "weight": 20, "count": 1, "is_group": False},
-    ],
-    "Project Based": [
-        {"name": "Progress Reports", "weight": 20, "count": 3, "is_group": True},
-        {"name": "Presentations", "weight": 30, "count": 2, "is_group": True},
-        {"name": "Final Project", "weight": 40, "count": 1, "is_group": False},
-        {"name": "Peer Review", "weight": 10, "count": 1, "is_group": False},
-    ],
-    "Custom": []  # Empty preset for manual entry
-}
 
 class ScrollableFrame(ttk.Frame):
     """A scrollable frame widget"""
@@ -130,20 +114,77 @@ class GradeScaleScreen(ttk.Frame):
         except ValueError:
             messagebox.showerror("Input Error", "Please enter valid numbers for all thresholds.")
 
+class SubjectPanel(ttk.LabelFrame):
+    """A subject's panel in SubjectEntryScreen, updated in place when the subject changes"""
+    def __init__(self, parent, on_edit, on_delete):
+        super().__init__(parent)
+        self.title = None
+        self.subject = None
+        
+        self.components_label = ttk.Label(self, justify="left", font=("Courier", 9))
+        self.components_label.pack(anchor="w", padx=10, pady=5)
+        
+        # Buttons
+        btn_frame = ttk.Frame(self)
+        btn_frame.pack(fill="x", pady=5)
+        
+        ttk.Button(btn_frame, text="Edit", command=on_edit).pack(side="left", padx=5)
+        ttk.Button(btn_frame, text="Delete", command=on_delete).pack(side="left", padx=5)
+        
+    def show(self, title, subject):
+        """Refresh the title and component table, skipping whatever has not changed"""
+        if title != self.title:
+            self.configure(text=title)
+            self.title = title
+        # The formatted table is cached until the panel is given a different subject
+        if subject is not self.subject:
+            self.components_label.configure(text=self.format_components(subject))
+            self.subject = subject
+            
+    @staticmethod
+    def format_components(subject):
+        """Components table as monospaced text"""
+        lines = [
+            "Components:",
+            f"{'Name':<20} {'Weight':<10} {'My Score':<15} {'Class Avg':<15}",
+            "-" * 60
+        ]
+        for comp in subject.components:
+            lines.append(f"{comp.name:<20} {comp.weight:<10.1f}% "
+                         f"{comp.my_marks}/{comp.max_marks} "
+                         f"{comp.class_avg_marks}/{comp.max_marks}")
+        return "\n".join(lines) + "\n"
+
 class SubjectEntryScreen(ttk.Frame):
     """Screen for entering subject details"""
-    def __init__(self, parent, grade_scale, on_complete):
+    def __init__(self, parent, grade_scale, on_complete, semester=None):
         super().__init__(parent)
         self.parent = parent
         self.grade_scale = grade_scale
         self.on_complete = on_complete
         self.subjects = []
+        # Stable keys parallel to self.subjects, so panels survive reordering by deletion
+        self.subject_keys = []
+        self.subject_panels = {}
+        self.next_subject_key = 0
         self.cgpa_var = tk.StringVar(value="")
         self.credits_var = tk.StringVar(value="")
         self.include_previous_var = tk.BooleanVar(value=False)
         
         self.setup_ui()
         
+        if semester is not None:
+            # Coming back from the results screen: restore what was entered
+            for subject in semester.subjects:
+                self.subjects.append(subject)
+                self.subject_keys.append(self.next_subject_key)
+                self.next_subject_key += 1
+            if semester.previous_cgpa is not None or semester.previous_credits is not None:
+                self.include_previous_var.set(True)
+                self.cgpa_var.set("" if semester.previous_cgpa is None else str(semester.previous_cgpa))
+                self.credits_var.set("" if semester.previous_credits is None else str(semester.previous_credits))
+            self.update_subjects_display()
+        
     def setup_ui(self):
         # Title
         ttk.Label(self, text="Subject Entry", font=("TkDefaultFont", 14, "bold")).pack(pady=10)
@@ -183,57 +224,39 @@ class SubjectEntryScreen(ttk.Frame):
         ttk.Button(btn_frame, text="Add Subject", 
                  command=self.add_subject).pack(side="left")
                  
+        ttk.Button(btn_frame, text="Import Gradebook...", 
+                 command=self.import_gradebook).pack(side="left", padx=5)
+                 
         ttk.Button(btn_frame, text="Calculate Results", 
                  command=self.save_and_continue).pack(side="right")
     
     def update_subjects_display(self):
-        """Update the UI to show all subjects"""
-        # Clear the frame first
-        for widget in self.subjects_frame.scrollable_frame.winfo_children():
-            widget.destroy()
+        """Reconcile the subject panels with self.subjects, creating, updating or removing only what changed"""
+        live_keys = set(self.subject_keys)
+        for key in [key for key in self.subject_panels if key not in live_keys]:
+            self.subject_panels.pop(key).destroy()
             
-        if not self.subjects:
-            self.no_subjects_label = ttk.Label(
-                self.subjects_frame.scrollable_frame, 
-                text="No subjects added yet. Click 'Add Subject' to begin."
-            )
-            self.no_subjects_label.pack(pady=20)
-            return
-            
-        # Add each subject
-        for i, subject in enumerate(self.subjects):
-            frame = ttk.LabelFrame(
-                self.subjects_frame.scrollable_frame,
-                text=f"{i+1}. {subject.name} ({subject.credit_hours} credits)"
-            )
-            frame.pack(fill="x", pady=5, padx=5, anchor="w")
-            
-            # Components table
-            components_text = "Components:\n"
-            components_text += f"{'Name':<20} {'Weight':<10} {'My Score':<15} {'Class Avg':<15}\n"
-            components_text += "-" * 60 + "\n"
-            
-            for comp in subject.components:
-                components_text += f"{comp.name:<20} {comp.weight:<10.1f}% "
-                components_text += f"{comp.my_marks}/{comp.max_marks} "
-                components_text += f"{comp.class_avg_marks}/{comp.max_marks}\n"
-                
-            ttk.Label(frame, text=components_text, justify="left", font=("Courier", 9)).pack(
-                anchor="w", padx=10, pady=5)
-                
-            # Buttons
-            btn_frame = ttk.Frame(frame)
-            btn_frame.pack(fill="x", pady=5)
-            
-            ttk.Button(
-                btn_frame, text="Edit", 
-                command=lambda s=subject, idx=i: self.edit_subject(s, idx)
-            ).pack(side="left", padx=5)
+        for i, (key, subject) in enumerate(zip(self.subject_keys, self.subjects)):
+            panel = self.subject_panels.get(key)
+            if panel is None:
+                # New subjects are always appended, so packing at the end keeps the order
+                panel = SubjectPanel(
+                    self.subjects_frame.scrollable_frame,
+                    on_edit=lambda k=key: self.edit_subject_by_key(k),
+                    on_delete=lambda k=key: self.delete_subject(self.subject_keys.index(k))
+                )
+                panel.pack(fill="x", pady=5, padx=5, anchor="w")
+                self.subject_panels[key] = panel
+            panel.show(f"{i+1}. {subject.name} ({subject.credit_hours} credits)", subject)
             
-            ttk.Button(
-                btn_frame, text="Delete", 
-                command=lambda idx=i: self.delete_subject(idx)
-            ).pack(side="left", padx=5)
+        if self.subjects:
+            self.no_subjects_label.pack_forget()
+        elif not self.no_subjects_label.winfo_manager():
+            self.no_subjects_label.pack(pady=20)
+    
+    def edit_subject_by_key(self, key):
+        index = self.subject_keys.index(key)
+        self.edit_subject(self.subjects[index], index)
     
     def add_subject(self):
         """Open dialog to add a new subject"""
@@ -243,8 +266,40 @@ class SubjectEntryScreen(ttk.Frame):
     def save_subject(self, subject):
         """Save a subject and update display"""
         self.subjects.append(subject)
+        self.subject_keys.append(self.next_subject_key)
+        self.next_subject_key += 1
+        self.update_subjects_display()
+        
+    def add_subjects(self, subjects):
+        """Append several subjects with a single redraw"""
+        for subject in subjects:
+            self.subjects.append(subject)
+            self.subject_keys.append(self.next_subject_key)
+            self.next_subject_key += 1
         self.update_subjects_display()
         
+    def import_gradebook(self):
+        """Add every subject of a gradebook CSV laid out like a preset's columns"""
+        file_path = filedialog.askopenfilename(
+            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")],
+            title="Import Gradebook"
+        )
+        
+        if not file_path:
+            return  # User canceled
+        
+        try:
+            subjects = import_gradebook_file(file_path)
+        except GradebookImportError as e:
+            messagebox.showerror("Import Error", f"The gradebook was not imported:\n\n{e}")
+            return
+        except (OSError, UnicodeDecodeError) as e:
+            messagebox.showerror("Import Error", f"Failed to read gradebook: {str(e)}")
+            return
+            
+        self.add_subjects(subjects)
+        messagebox.showinfo("Import Successful", f"Imported {len(subjects)} subjects from {os.path.basename(file_path)}")
+        
     def edit_subject(self, subject, index):
         """Open dialog to edit an existing subject"""
         dialog = SubjectDialog(self.parent, subject=subject, on_save=lambda s: self.update_subject(s, index))
@@ -263,6 +318,7 @@ class SubjectEntryScreen(ttk.Frame):
         )
         if confirm:
             self.subjects.pop(index)
+            self.subject_keys.pop(index)
             self.update_subjects_display()
     
     def save_and_continue(self):
@@ -392,9 +448,35 @@ class SubjectDialog(tk.Toplevel):
         components_label.pack(anchor="w", padx=20, pady=5)
         
         # Components list frame
-        self.components_frame = ScrollableFrame(self)
+        self.components_frame = ttk.Frame(self)
         self.components_frame.pack(fill="both", expand=True, padx=20, pady=5)
         
+        self.no_components_label = ttk.Label(
+            self.components_frame,
+            text="No components added yet. Use the buttons below to add components."
+        )
+        
+        # A Treeview only draws the visible rows, so long lists stay cheap to update
+        columns = ("name", "weight", "max_marks", "my_marks", "class_avg")
+        self.components_tree = ttk.Treeview(
+            self.components_frame, columns=columns, show="headings",
+            selectmode="browse", height=8
+        )
+        headings = ("Component", "Weight (%)", "Max Marks", "My Marks", "Class Avg")
+        for column, heading in zip(columns, headings):
+            self.components_tree.heading(column, text=heading)
+            self.components_tree.column(column, width=150 if column == "name" else 90,
+                                        anchor="w" if column == "name" else "e")
+        
+        tree_scrollbar = ttk.Scrollbar(self.components_frame, orient="vertical",
+                                       command=self.components_tree.yview)
+        self.components_tree.configure(yscrollcommand=tree_scrollbar.set)
+        self.components_tree.pack(side="left", fill="both", expand=True)
+        tree_scrollbar.pack(side="right", fill="y")
+        
+        self.components_tree.bind("<Double-1>", lambda e: self.edit_selected_component())
+        self.components_tree.bind("<Delete>", lambda e: self.delete_selected_component())
+        
         # Update components display
         self.update_components_display()
         
@@ -402,6 +484,15 @@ class SubjectDialog(tk.Toplevel):
         btn_row = ttk.Frame(self)
         btn_row.pack(fill="x", padx=20, pady=5)
         
+        ttk.Button(btn_row, text="Edit Selected", 
+                 command=self.edit_selected_component).pack(side="left", padx=5)
+                 
+        ttk.Button(btn_row, text="Delete Selected", 
+                 command=self.delete_selected_component).pack(side="left", padx=5)
+        
+        btn_row = ttk.Frame(self)
+        btn_row.pack(fill="x", padx=20, pady=5)
+        
         ttk.Button(btn_row, text="Add Single Component", 
                  command=self.add_single_component).pack(side="left", padx=5)
                  
@@ -472,6 +563,7 @@ class SubjectDialog(tk.Toplevel):
             
         # Clear current components
         self.components = []
+        self.update_components_display()
         
         # Get preset components
         preset_components = SUBJECT_PRESETS[preset_name]
@@ -517,61 +609,47 @@ class SubjectDialog(tk.Toplevel):
         )
         self.components.append(new_component)
     
+    def component_values(self, comp):
+        """Column values shown for a component row"""
+        return (comp.name, f"{comp.weight:.1f}", f"{comp.max_marks}",
+                f"{comp.my_marks}", f"{comp.class_avg_marks}")
+    
+    def update_empty_state(self):
+        """Show the placeholder text only while there are no components"""
+        if self.components:
+            self.no_components_label.pack_forget()
+        elif not self.no_components_label.winfo_manager():
+            self.no_components_label.pack(side="top", pady=20, before=self.components_tree)
+    
     def update_components_display(self):
-        """Update the components list display"""
-        # Clear the frame first
-        for widget in self.components_frame.scrollable_frame.winfo_children():
-            widget.destroy()
-            
-        if not self.components:
-            ttk.Label(
-                self.components_frame.scrollable_frame,
-                text="No components added yet. Use the buttons below to add components."
-            ).pack(pady=20)
-            return
-            
-        # Add table header
-        header = ttk.Frame(self.components_frame.scrollable_frame)
-        header.pack(fill="x", pady=5)
-        ttk.Label(header, text="Component", width=15).grid(row=0, column=0, padx=5)
-        ttk.Label(header, text="Weight (%)", width=10).grid(row=0, column=1, padx=5)
-        ttk.Label(header, text="Max Marks", width=10).grid(row=0, column=2, padx=5)
-        ttk.Label(header, text="My Marks", width=10).grid(row=0, column=3, padx=5)
-        ttk.Label(header, text="Class Avg", width=10).grid(row=0, column=4, padx=5)
-        ttk.Label(header, text="Actions", width=15).grid(row=0, column=5, padx=5)
-        
-        # Add each component as a row
-        for i, comp in enumerate(self.components):
-            row = ttk.Frame(self.components_frame.scrollable_frame)
-            row.pack(fill="x", pady=2)
-            
-            ttk.Label(row, text=comp.name, width=15).grid(row=0, column=0, padx=5)
-            ttk.Label(row, text=f"{comp.weight:.1f}", width=10).grid(row=0, column=1, padx=5)
-            ttk.Label(row, text=f"{comp.max_marks}", width=10).grid(row=0, column=2, padx=5)
-            ttk.Label(row, text=f"{comp.my_marks}", width=10).grid(row=0, column=3, padx=5)
-            ttk.Label(row, text=f"{comp.class_avg_marks}", width=10).grid(row=0, column=4, padx=5)
-            
-            # Action buttons
-            btn_frame = ttk.Frame(row)
-            btn_frame.grid(row=0, column=5, padx=5)
-            
-            # Fix: Create a function that has the component index hardcoded
-            def create_edit_func(index):
-                return lambda: self.edit_component(self.components[index], index)
-            
-            # Fix: Create a function that has the component index hardcoded
-            def create_delete_func(index):
-                return lambda: self.delete_component(index)
-            
-            ttk.Button(
-                btn_frame, text="Edit",
-                command=create_edit_func(i)
-            ).pack(side="left", padx=2)
-            
-            ttk.Button(
-                btn_frame, text="Delete",
-                command=create_delete_func(i)
-            ).pack(side="left", padx=2)
+        """Reload every component row, e.g. after a preset replaces the list"""
+        self.components_tree.delete(*self.components_tree.get_children())
+        for comp in self.components:
+            self.components_tree.insert("", "end", values=self.component_values(comp))
+        self.update_empty_state()
+    
+    def component_row(self, index):
+        """Tree item for the component at index; rows mirror self.components"""
+        return self.components_tree.get_children()[index]
+    
+    def selected_component_index(self):
+        selection = self.components_tree.selection()
+        if not selection:
+            messagebox.showinfo("No Component Selected", "Select a component in the list first.")
+            return None
+        return self.components_tree.index(selection[0])
+    
+    def edit_selected_component(self):
+        """Edit the component selected in the list"""
+        index = self.selected_component_index()
+        if index is not None:
+            self.edit_component(self.components[index], index)
+    
+    def delete_selected_component(self):
+        """Delete the component selected in the list"""
+        index = self.selected_component_index()
+        if index is not None:
+            self.delete_component(index)
     
     def add_single_component(self):
         """Open dialog to add a new component"""
@@ -589,14 +667,17 @@ class SubjectDialog(tk.Toplevel):
         self.wait_window(dialog)
         
     def save_component(self, component):
-        """Save a component and update the display"""
+        """Save a component and add its row"""
         self.components.append(component)
-        self.update_components_display()
+        self.components_tree.insert("", "end", values=self.component_values(component))
+        self.update_empty_state()
     
     def save_multiple_components(self, components):
-        """Save multiple components and update the display"""
+        """Save multiple components and add their rows"""
         self.components.extend(components)
-        self.update_components_display()
+        for component in components:
+            self.components_tree.insert("", "end", values=self.component_values(component))
+        self.update_empty_state()
         
     def edit_component(self, component, index):
         """Open dialog to edit an existing component"""
@@ -610,14 +691,15 @@ class SubjectDialog(tk.Toplevel):
         self.wait_window(dialog)
         
     def update_component(self, component, index):
-        """Update an existing component"""
+        """Update an existing component and redraw only its row"""
         self.components[index] = component
-        self.update_components_display()
+        self.components_tree.item(self.component_row(index), values=self.component_values(component))
         
     def delete_component(self, index):
-        """Delete a component"""
+        """Delete a component and its row"""
         self.components.pop(index)
-        self.update_components_display()
+        self.components_tree.delete(self.component_row(index))
+        self.update_empty_state()
         
     def save_subject(self):
         """Save the subject and close dialog"""
@@ -1025,16 +1107,193 @@ class ComponentDialog(tk.Toplevel):
         self.on_save(component)
         self.destroy()
 
+class SubjectResultPanel(ttk.LabelFrame):
+    """A subject's results: header and totals up front, component breakdown built on first expand"""
+    def __init__(self, parent, subject_summary):
+        super().__init__(
+            parent,
+            text=f"{subject_summary['name']} ({subject_summary['credit_hours']} credits) - "
+                 f"Grade: {subject_summary['predicted_grade']} ({subject_summary['grade_points']} points)"
+        )
+        self.subject_summary = subject_summary
+        self.breakdown = None
+        self.expanded = False
+        
+        # Overall stats
+        stats_frame = ttk.Frame(self)
+        stats_frame.pack(fill="x", padx=10, pady=5)
+        
+        col1 = ttk.Frame(stats_frame)
+        col1.pack(side="left", fill="y", padx=10)
+        col2 = ttk.Frame(stats_frame)
+        col2.pack(side="left", fill="y", padx=10)
+        
+        ttk.Label(col1, text=f"My weighted total: {subject_summary['weighted_my_score']:.1f}/100").pack(anchor="w")
+        ttk.Label(col1, text=f"Class average: {subject_summary['weighted_class_avg']:.1f}/100").pack(anchor="w")
+        
+        rel_perf = subject_summary['relative_performance_percentage']
+        ttk.Label(col2, text=f"Relative performance: {rel_perf:+.1f}%").pack(anchor="w")
+        ttk.Label(col2, text=f"Raw marks: {subject_summary['my_total_raw']}/{subject_summary['max_total_raw']}").pack(anchor="w")
+        
+        # Components section
+        if subject_summary["components"]:
+            self.toggle_button = ttk.Button(self, command=self.toggle)
+            self.toggle_button.pack(anchor="w", padx=10, pady=(10, 5))
+            self.update_toggle_text()
+            
+    def update_toggle_text(self):
+        count = len(self.subject_summary["components"])
+        if self.expanded:
+            self.toggle_button.configure(text="Hide Component Breakdown")
+        else:
+            self.toggle_button.configure(text=f"Show Component Breakdown ({count})")
+            
+    def toggle(self):
+        """Expand or collapse the component breakdown"""
+        if self.expanded:
+            self.breakdown.pack_forget()
+        else:
+            if self.breakdown is None:
+                self.breakdown = self.build_breakdown()
+            self.breakdown.pack(fill="x", padx=10, pady=5)
+        self.expanded = not self.expanded
+        self.update_toggle_text()
+        
+    def build_breakdown(self):
+        """One Treeview for all component rows, instead of a grid of labels"""
+        components = self.subject_summary["components"]
+        frame = ttk.Frame(self)
+        
+        columns = ("name", "weight", "my_score", "class_avg", "relative")
+        tree = ttk.Treeview(frame, columns=columns, show="headings", height=min(len(components), 10))
+        headings = ("Component", "Weight", "My Score", "Class Avg", "Relative")
+        widths = (160, 70, 140, 140, 80)
+        for column, heading, width in zip(columns, headings, widths):
+            tree.heading(column, text=heading)
+            tree.column(column, width=width, anchor="w")
+            
+        for comp in components:
+            tree.insert("", "end", values=(
+                comp["name"],
+                f"{comp['weight']:.1f}%",
+                f"{comp['my_marks']}/{comp['max_marks']} ({comp['my_percentage']:.1f}%)",
+                f"{comp['class_avg_marks']}/{comp['max_marks']} ({comp['class_avg_percentage']:.1f}%)",
+                f"{comp['relative_performance_percentage']:+.1f}%"
+            ))
+            
+        tree.pack(side="left", fill="x", expand=True)
+        if len(components) > 10:
+            scrollbar = ttk.Scrollbar(frame, orient="vertical", command=tree.yview)
+            tree.configure(yscrollcommand=scrollbar.set)
+            scrollbar.pack(side="right", fill="y")
+        return frame
+
+class SummaryCancelled(Exception):
+    """Raised inside the worker thread to abandon a summary calculation"""
+
 class ResultsScreen(ttk.Frame):
     """Screen for showing calculation results"""
-    def __init__(self, parent, semester, grade_scale):
+    # How often the Tk event loop checks on the worker thread
+    POLL_INTERVAL_MS = 50
+    
+    def __init__(self, parent, semester, grade_scale, on_back=None, cache=None):
         super().__init__(parent)
         self.parent = parent
         self.semester = semester
         self.grade_scale = grade_scale
-        self.semester_summary = generate_semester_summary(semester, grade_scale)
+        self.on_back = on_back
+        self.cache = cache
+        self.semester_summary = None
+        self.cancel_event = threading.Event()
+        self.results_queue = queue.Queue()
+        self.poll_id = None
+        
+        self.start_calculation()
+        
+    def start_calculation(self):
+        """Compute the summary on a worker thread while the window stays responsive"""
+        self.progress_frame = ttk.Frame(self)
+        self.progress_frame.pack(expand=True)
+        
+        ttk.Label(self.progress_frame, text="Calculating results...", 
+                font=("TkDefaultFont", 12)).pack(pady=10)
+        
+        self.progress_bar = ttk.Progressbar(
+            self.progress_frame, orient="horizontal", length=300,
+            mode="determinate", maximum=max(len(self.semester.subjects), 1)
+        )
+        self.progress_bar.pack(pady=5)
+        
+        ttk.Button(self.progress_frame, text="Cancel", 
+                 command=self.cancel_calculation).pack(pady=10)
+        
+        # The worker summarizes copies, so edits made after Back or Cancel cannot race with it
+        semester, grade_scale = copy.deepcopy((self.semester, self.grade_scale))
+        threading.Thread(target=self.calculate_summary, args=(semester, grade_scale), daemon=True).start()
+        self.poll_id = self.after(self.POLL_INTERVAL_MS, self.poll_calculation)
+        
+    def calculate_summary(self, semester, grade_scale):
+        """Worker thread body; talks to the UI only through results_queue"""
+        def report_progress(done, total):
+            if self.cancel_event.is_set():
+                raise SummaryCancelled()
+            self.results_queue.put(("progress", done))
+            
+        try:
+            if self.cache is not None:
+                summary = self.cache.semester_summary(semester, grade_scale, progress=report_progress)
+            else:
+                summary = generate_semester_summary(semester, grade_scale, progress=report_progress)
+        except SummaryCancelled:
+            return
+        except Exception as e:
+            if not self.cancel_event.is_set():
+                self.results_queue.put(("error", e))
+            return
+        # A cache hit never reports progress, so cancellation is checked again before publishing
+        if not self.cancel_event.is_set():
+            self.results_queue.put(("done", summary))
         
-        self.setup_ui()
+    def poll_calculation(self):
+        """Apply the worker's messages on the Tk thread"""
+        self.poll_id = None
+        try:
+            while True:
+                kind, value = self.results_queue.get_nowait()
+                if self.cancel_event.is_set():
+                    return  # Cancelled after the worker queued this; nothing is shown
+                if kind == "progress":
+                    self.progress_bar["value"] = value
+                elif kind == "error":
+                    self.progress_frame.destroy()
+                    messagebox.showerror("Calculation Error", f"Failed to calculate results: {value}")
+                    self.go_back()
+                    return
+                else:
+                    self.semester_summary = value
+                    self.progress_frame.destroy()
+                    self.setup_ui()
+                    return
+        except queue.Empty:
+            pass
+        self.poll_id = self.after(self.POLL_INTERVAL_MS, self.poll_calculation)
+        
+    def cancel_calculation(self):
+        """Stop the worker and return to subject entry"""
+        self.cancel_event.set()
+        self.go_back()
+        
+    def go_back(self):
+        if self.on_back is not None:
+            self.on_back(self.semester)
+        
+    def destroy(self):
+        # Stop polling and let a still-running worker finish early
+        self.cancel_event.set()
+        if self.poll_id is not None:
+            self.after_cancel(self.poll_id)
+            self.poll_id = None
+        super().destroy()
         
     def setup_ui(self):
         # Title
@@ -1068,67 +1327,20 @@ class ResultsScreen(ttk.Frame):
         ttk.Button(btn_frame, text="Save Results", 
                  command=self.save_results).pack(side="left", padx=5)
         
+        self.compact_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(btn_frame, text="Compact JSON", 
+                      variable=self.compact_var).pack(side="left", padx=5)
+        
         ttk.Button(btn_frame, text="Start New Analysis", 
-                 command=lambda: self.parent.switch_to_start()).pack(side="right", padx=5)
+                 command=lambda: self.winfo_toplevel().switch_to_start()).pack(side="right", padx=5)
+        
+        if self.on_back is not None:
+            ttk.Button(btn_frame, text="Back to Subjects", 
+                     command=self.go_back).pack(side="right", padx=5)
         
     def add_subject_panel(self, parent, subject_summary):
         """Add a collapsible panel for a subject"""
-        frame = ttk.LabelFrame(
-            parent,
-            text=f"{subject_summary['name']} ({subject_summary['credit_hours']} credits) - "
-                 f"Grade: {subject_summary['predicted_grade']} ({subject_summary['grade_points']} points)"
-        )
-        frame.pack(fill="x", pady=5, padx=5)
-        
-        # Overall stats
-        stats_frame = ttk.Frame(frame)
-        stats_frame.pack(fill="x", padx=10, pady=5)
-        
-        col1 = ttk.Frame(stats_frame)
-        col1.pack(side="left", fill="y", padx=10)
-        col2 = ttk.Frame(stats_frame)
-        col2.pack(side="left", fill="y", padx=10)
-        
-        ttk.Label(col1, text=f"My weighted total: {subject_summary['weighted_my_score']:.1f}/100").pack(anchor="w")
-        ttk.Label(col1, text=f"Class average: {subject_summary['weighted_class_avg']:.1f}/100").pack(anchor="w")
-        
-        rel_perf = subject_summary['relative_performance_percentage']
-        ttk.Label(col2, text=f"Relative performance: {rel_perf:+.1f}%").pack(anchor="w")
-        ttk.Label(col2, text=f"Raw marks: {subject_summary['my_total_raw']}/{subject_summary['max_total_raw']}").pack(anchor="w")
-        
-        # Components section
-        if subject_summary["components"]:
-            components_label = ttk.Label(frame, text="Component Breakdown:", font=("TkDefaultFont", 10, "bold"))
-            components_label.pack(anchor="w", padx=10, pady=(10, 5))
-            
-            # Table headers
-            table_frame = ttk.Frame(frame)
-            table_frame.pack(fill="x", padx=10, pady=5)
-            
-            ttk.Label(table_frame, text="Component", width=20, font=("TkDefaultFont", 9, "bold")).grid(row=0, column=0, sticky="w")
-            ttk.Label(table_frame, text="Weight", width=10, font=("TkDefaultFont", 9, "bold")).grid(row=0, column=1, sticky="w")
-            ttk.Label(table_frame, text="My Score", width=15, font=("TkDefaultFont", 9, "bold")).grid(row=0, column=2, sticky="w")
-            ttk.Label(table_frame, text="Class Avg", width=15, font=("TkDefaultFont", 9, "bold")).grid(row=0, column=3, sticky="w")
-            ttk.Label(table_frame, text="Relative", width=10, font=("TkDefaultFont", 9, "bold")).grid(row=0, column=4, sticky="w")
-            
-            # Add separator
-            ttk.Separator(frame, orient="horizontal").pack(fill="x", padx=10, pady=5)
-            
-            # Component rows
-            for i, comp in enumerate(subject_summary["components"]):
-                row = ttk.Frame(frame)
-                row.pack(fill="x", padx=10, pady=2)
-                
-                ttk.Label(row, text=comp["name"], width=20).grid(row=0, column=0, sticky="w")
-                ttk.Label(row, text=f"{comp['weight']:.1f}%", width=10).grid(row=0, column=1, sticky="w")
-                ttk.Label(row, text=f"{comp['my_marks']}/{comp['max_marks']} ({comp['my_percentage']:.1f}%)", 
-                        width=15).grid(row=0, column=2, sticky="w")
-                ttk.Label(row, text=f"{comp['class_avg_marks']}/{comp['max_marks']} ({comp['class_avg_percentage']:.1f}%)", 
-                        width=15).grid(row=0, column=3, sticky="w")
-                        
-                rel_perf = comp['relative_performance_percentage']
-                ttk.Label(row, text=f"{rel_perf:+.1f}%", 
-                        width=10).grid(row=0, column=4, sticky="w")
+        SubjectResultPanel(parent, subject_summary).pack(fill="x", pady=5, padx=5)
     
     def save_results(self):
         """Save results to a JSON file"""
@@ -1142,8 +1354,7 @@ class ResultsScreen(ttk.Frame):
             return  # User canceled
         
         try:
-            with open(file_path, 'w') as f:
-                json.dump(self.semester_summary, f, indent=2)
+            write_summary(self.semester_summary, file_path, compact=self.compact_var.get())
             messagebox.showinfo("Save Successful", f"Results saved to {file_path}")
         except Exception as e:
             messagebox.showerror("Save Error", f"Failed to save results: {str(e)}")
@@ -1165,6 +1376,9 @@ class MainApp(tk.Tk):
         self.container = ttk.Frame(self)
         self.container.pack(fill="both", expand=True)
         
+        # Reused across Back/Calculate round trips; unchanged subjects are not recomputed
+        self.summary_cache = SummaryCache()
+        
         self.current_frame = None
         self.switch_to_start()
         
@@ -1179,8 +1393,8 @@ class MainApp(tk.Tk):
         )
         self.current_frame.pack(fill="both", expand=True)
         
-    def switch_to_subject_entry(self, grade_scale):
-        """Switch to the subject entry screen"""
+    def switch_to_subject_entry(self, grade_scale, semester=None):
+        """Switch to the subject entry screen, optionally pre-filled from a semester"""
         if self.current_frame:
             self.current_frame.destroy()
             
@@ -1188,7 +1402,8 @@ class MainApp(tk.Tk):
         self.current_frame = SubjectEntryScreen(
             self.container, 
             grade_scale,
-            on_complete=self.switch_to_results
+            on_complete=self.switch_to_results,
+            semester=semester
         )
         self.current_frame.pack(fill="both", expand=True)
         
@@ -1200,7 +1415,9 @@ class MainApp(tk.Tk):
         self.current_frame = ResultsScreen(
             self.container,
             semester,
-            self.grade_scale
+            self.grade_scale,
+            on_back=lambda s: self.switch_to_subject_entry(self.grade_scale, s),
+            cache=self.summary_cache
         )
         self.current_frame.pack(fill="both", expand=True)
 
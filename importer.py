@@ -0,0 +1,147 @@
+import csv
+import re
+from typing import Dict, Iterable, List, Optional, TextIO
+
+from models import Component, Subject
+from presets import SUBJECT_PRESETS, expand_preset
+
+# Header names are matched case-insensitively
+SUBJECT_COLUMN = "Subject"
+CREDITS_COLUMN = "Credits"
+MARK_COLUMNS = (("max_marks", "Max"), ("my_marks", "Marks"), ("class_avg_marks", "Class Avg"))
+
+# Errors listed in a GradebookImportError message; the rest are only counted
+MAX_REPORTED_ERRORS = 20
+
+
+class GradebookImportError(ValueError):
+    """Every problem found in a gradebook file, collected in one pass"""
+    def __init__(self, errors: List[str]):
+        self.errors = errors
+        shown = errors[:MAX_REPORTED_ERRORS]
+        if len(errors) > len(shown):
+            shown.append(f"... and {len(errors) - len(shown)} more")
+        super().__init__("\n".join(shown))
+
+
+def _normalize(name: str) -> str:
+    return " ".join(name.split()).lower()
+
+
+def gradebook_columns(preset_name: str, group_counts: Optional[Dict[str, int]] = None) -> List[str]:
+    """Header row of a gradebook for a preset: subject, credits, then max/marks/average per component"""
+    columns = [SUBJECT_COLUMN, CREDITS_COLUMN]
+    for name, _ in expand_preset(preset_name, group_counts):
+        columns.extend(f"{name} {suffix}" for _, suffix in MARK_COLUMNS)
+    return columns
+
+
+def infer_group_counts(header: Iterable[str], preset_name: str) -> Dict[str, int]:
+    """Group sizes implied by numbered columns, e.g. 'Lab Reports 12 Marks' means 12 lab reports"""
+    header = [_normalize(name) for name in header]
+    counts = {}
+    for preset_comp in SUBJECT_PRESETS[preset_name]:
+        if not preset_comp["is_group"]:
+            continue
+        pattern = re.compile(re.escape(_normalize(preset_comp["name"])) + r" (\d+) marks")
+        numbers = [int(match.group(1)) for match in map(pattern.fullmatch, header) if match]
+        if numbers:
+            counts[preset_comp["name"]] = max(numbers)
+    return counts
+
+
+def detect_preset(header: Iterable[str]) -> Optional[str]:
+    """The first preset whose component columns are all present in the header"""
+    header = list(header)
+    present = {_normalize(name) for name in header}
+    for preset_name, components in SUBJECT_PRESETS.items():
+        if not components:
+            continue
+        columns = gradebook_columns(preset_name, infer_group_counts(header, preset_name))
+        if all(_normalize(column) in present for column in columns):
+            return preset_name
+    return None
+
+
+def import_gradebook(stream: TextIO, preset_name: Optional[str] = None, delimiter: str = ",") -> List[Subject]:
+    """Read one subject per row of a delimited gradebook laid out like gradebook_columns.
+
+    The preset is detected from the header when not given, and group sizes are
+    taken from the numbered columns present. Every row is validated before any
+    subject is returned; all problems are raised together as a
+    GradebookImportError.
+    """
+    reader = csv.reader(stream, delimiter=delimiter)
+    header = next(reader, None)
+    if header is None:
+        raise GradebookImportError(["The file is empty."])
+
+    if preset_name is None:
+        preset_name = detect_preset(header)
+        if preset_name is None:
+            raise GradebookImportError(["The header does not match the columns of any preset."])
+    group_counts = infer_group_counts(header, preset_name)
+    template = expand_preset(preset_name, group_counts)
+
+    positions = {_normalize(name): i for i, name in enumerate(header)}
+    missing = [column for column in gradebook_columns(preset_name, group_counts)
+               if _normalize(column) not in positions]
+    if missing:
+        raise GradebookImportError([f"Missing column: {column}" for column in missing])
+    subject_index = positions[_normalize(SUBJECT_COLUMN)]
+    credits_index = positions[_normalize(CREDITS_COLUMN)]
+    component_indices = [
+        (name, weight, [positions[_normalize(f"{name} {suffix}")] for _, suffix in MARK_COLUMNS])
+        for name, weight in template
+    ]
+
+    subjects = []
+    errors = []
+    for line_number, row in enumerate(reader, 2):
+        if not any(cell.strip() for cell in row):
+            continue
+        if len(row) < len(header):
+            errors.append(f"Line {line_number}: expected {len(header)} fields, found {len(row)}.")
+            continue
+
+        name = row[subject_index].strip()
+        if not name:
+            errors.append(f"Line {line_number}: subject name cannot be empty.")
+        try:
+            credit_hours = float(row[credits_index])
+            if credit_hours < 0:
+                errors.append(f"Line {line_number}: credits must be at least 0.")
+        except ValueError:
+            errors.append(f"Line {line_number}: invalid number for credits.")
+            credit_hours = 0.0
+
+        components = []
+        for comp_name, weight, (max_index, my_index, avg_index) in component_indices:
+            try:
+                max_marks, my_marks, class_avg = float(row[max_index]), float(row[my_index]), float(row[avg_index])
+            except ValueError:
+                errors.append(f"Line {line_number}: invalid number for {comp_name}.")
+                continue
+            # Same rules as ComponentDialog
+            if max_marks <= 0:
+                errors.append(f"Line {line_number}: {comp_name} maximum marks must be greater than zero.")
+            elif not 0 <= my_marks <= max_marks:
+                errors.append(f"Line {line_number}: {comp_name} marks must be between 0 and {max_marks}.")
+            elif not 0 <= class_avg <= max_marks:
+                errors.append(f"Line {line_number}: {comp_name} class average must be between 0 and {max_marks}.")
+            else:
+                components.append(Component(comp_name, weight, max_marks, my_marks, class_avg))
+
+        # Once anything is wrong the import fails, so only the errors are still collected
+        if not errors:
+            subjects.append(Subject(name, credit_hours, components))
+
+    if errors:
+        raise GradebookImportError(errors)
+    return subjects
+
+
+def import_gradebook_file(path: str, preset_name: Optional[str] = None, delimiter: str = ",") -> List[Subject]:
+    """import_gradebook on a file path"""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        return import_gradebook(f, preset_name, delimiter)
@@ -0,0 +1,117 @@
+"""Load-test the HTTP service from the same machine.
+
+Usage: python loadtest.py [--url http://127.0.0.1:8765] [--connections 4]
+                          [--requests 200] [--batch 50] [--spawn]
+
+Each connection is a keep-alive http.client connection on its own thread that
+posts batches of synthetic semesters to /summaries. With --spawn a server is
+started in this process on a free port, so no separate terminal is needed.
+"""
+import argparse
+import http.client
+import json
+import statistics
+import sys
+import threading
+import time
+from typing import Dict, List
+from urllib.parse import urlsplit
+
+from batch import semester_to_dict
+from synthetic import synthetic_cohort
+
+
+def _worker(host: str, port: int, bodies: List[bytes], latencies: List[float], failures: List[str]):
+    connection = http.client.HTTPConnection(host, port)
+    try:
+        for body in bodies:
+            start = time.perf_counter()
+            connection.request("POST", "/summaries", body, {"Content-Type": "application/json"})
+            response = connection.getresponse()
+            response.read()
+            latencies.append(time.perf_counter() - start)
+            if response.status != 200:
+                failures.append(f"HTTP {response.status}")
+    finally:
+        connection.close()
+
+
+def run_load_test(host: str, port: int, connections: int = 4, requests: int = 200,
+                  batch: int = 50, distinct: int = 1000, seed: int = 0) -> Dict:
+    """Send requests batches of batch semesters over connections parallel connections.
+
+    Semesters are drawn from a pool of distinct synthetic ones, so repeated
+    semesters exercise the server's summary cache.
+    """
+    records = [semester_to_dict(s) for s in synthetic_cohort(distinct, seed=seed)]
+    bodies = [
+        json.dumps({"semesters": [records[(i * batch + j) % distinct] for j in range(batch)]}).encode("utf-8")
+        for i in range(requests)
+    ]
+    latencies: List[float] = []
+    failures: List[str] = []
+    threads = [
+        threading.Thread(target=_worker, args=(host, port, bodies[i::connections], latencies, failures))
+        for i in range(connections)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    percentile = lambda p: latencies[min(int(p * len(latencies)), len(latencies) - 1)] * 1000
+    return {
+        "connections": connections,
+        "requests": len(latencies),
+        "semesters": len(latencies) * batch,
+        "failures": len(failures),
+        "seconds": elapsed,
+        "requests_per_second": len(latencies) / elapsed,
+        "semesters_per_second": len(latencies) * batch / elapsed,
+        "latency_ms": {
+            "mean": statistics.mean(latencies) * 1000 if latencies else 0.0,
+            "p50": percentile(0.50) if latencies else 0.0,
+            "p95": percentile(0.95) if latencies else 0.0,
+            "p99": percentile(0.99) if latencies else 0.0,
+        }
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Load-test the grade service on this machine.")
+    parser.add_argument("--url", default="http://127.0.0.1:8765", help="service URL (default: http://127.0.0.1:8765)")
+    parser.add_argument("--connections", type=int, default=4, help="parallel keep-alive connections (default: 4)")
+    parser.add_argument("--requests", type=int, default=200, help="total requests (default: 200)")
+    parser.add_argument("--batch", type=int, default=50, help="semesters per request (default: 50)")
+    parser.add_argument("--distinct", type=int, default=1000,
+                        help="distinct synthetic semesters to draw from (default: 1000)")
+    parser.add_argument("--spawn", action="store_true", help="start a server in this process on a free port")
+    args = parser.parse_args(argv)
+
+    server = None
+    if args.spawn:
+        from server import GradeServer, GradeService
+        server = GradeServer(("127.0.0.1", 0), GradeService(), quiet=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        host, port = "127.0.0.1", server.server_port
+    else:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port or 80
+
+    try:
+        result = run_load_test(host, port, args.connections, args.requests, args.batch, args.distinct)
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+
+    json.dump(result, sys.stdout, indent=2)
+    print()
+    return 1 if result["failures"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,35 @@
 import sys
-from cli import run_cli
-from gui import run_gui
+
+
+def load_entry_point(mode: str):
+    """Import only the front end selected on the command line"""
+    if mode == "--cli":
+        from cli import run_cli
+        return run_cli
+    if mode == "--batch":
+        from batch import run_batch_cli
+        return run_batch_cli
+    if mode == "--serve":
+        from server import run_server_cli
+        return run_server_cli
+    # tkinter is only imported when the GUI is actually started
+    from gui import run_gui
+    return run_gui
 
 
 if __name__ == "__main__":
-    # Check if the user wants to use GUI or CLI
-    if len(sys.argv) > 1 and sys.argv[1].lower() == "--cli":
-        run_cli()
+    # Check if the user wants to use GUI, CLI, headless batch mode or the HTTP service
+    mode = sys.argv[1].lower() if len(sys.argv) > 1 else ""
+    if mode in ("--cli", "--batch"):
+        # --profile prints a table of stage timings on stderr; --profile=FILE writes them as JSON
+        from profiling import run_profiled, split_profile_option
+        argv, target = split_profile_option(sys.argv[2:])
+        args = (argv,) if mode == "--batch" else ()
+        if target is None:
+            sys.exit(load_entry_point(mode)(*args))
+        sys.exit(run_profiled(load_entry_point(mode), target, *args))
+    elif mode == "--serve":
+        sys.exit(load_entry_point(mode)(sys.argv[2:]))
     else:
         # Default to GUI if no arguments or if anything other than --cli is specified
-        run_gui()
+        load_entry_point(mode)()
@@ -1,14 +1,232 @@
-from dataclasses import dataclass, field
-from typing import Dict, List, Optional
+import math
+import weakref
+from array import array
+from bisect import bisect_right
+from dataclasses import dataclass, field, fields
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Union
 
+_set = object.__setattr__
 
-@dataclass
-class Component:
-    name: str
-    weight: float  # Weight as a percentage (0-100)
-    max_marks: float
-    my_marks: float
-    class_avg_marks: float
+
+def _add_owner(owners, owner):
+    """owners is None, a single owner or a tuple of them; one owner needs no tuple.
+
+    Counters of freed containers are dropped when another container's counter is
+    added, which is the only way they pile up.
+    """
+    if owners is None or owners is owner:
+        return owner
+    if type(owners) is tuple:
+        if owner in owners:
+            return owners
+        if type(owner) is _Version:
+            return (*[o for o in owners if type(o) is not _Version or o.live], owner)
+        return owners + (owner,)
+    return (owners, owner) if type(owners) is not _Version or owners.live else owner
+
+
+def _remove_owner(owners, owner):
+    if owners is owner:
+        return None
+    if type(owners) is tuple:
+        owners = tuple(o for o in owners if o is not owner)
+        return owners[0] if len(owners) == 1 else owners or None
+    return owners
+
+
+def _notify(owners):
+    if owners is None:
+        return
+    if type(owners) is tuple:
+        for owner in owners:
+            owner._changed()
+    else:
+        owners._changed()
+
+
+class _Version:
+    """Change counter of a Subject or Semester.
+
+    Objects held by a container keep a strong reference to the container's
+    counter rather than to the container, so a write bumps a short chain of
+    counters without weak references or reference cycles. Containers compare
+    the counter with the value their cached aggregates were computed at.
+    """
+    __slots__ = ("value", "owners", "live")
+
+    def __init__(self):
+        self.value = 0
+        self.owners = None  # Counters (or links) of the containers holding the owner
+        self.live = True  # False once the container is freed; its items then drop the counter
+
+    def _changed(self):
+        self.value += 1
+        _notify(self.owners)
+
+
+class _Tracked:
+    """Base for model objects whose writes invalidate cached aggregates"""
+    __slots__ = ()
+    _tracked_fields = frozenset()
+
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        if name in self._tracked_fields:
+            self._changed()
+
+    def _changed(self):
+        _notify(self._owners)
+
+    def _attach(self, owner):
+        object.__setattr__(self, "_owners", _add_owner(self._owners, owner))
+
+    def _detach(self, owner):
+        object.__setattr__(self, "_owners", _remove_owner(self._owners, owner))
+
+    def __getstate__(self):
+        # Owner links and caches are rebuilt on unpickling
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+
+    def __setstate__(self, state):
+        object.__setattr__(self, "_owners", None)
+        for name, value in state.items():
+            setattr(self, name, value)
+
+
+class _TrackedContainer(_Tracked):
+    """A Subject or Semester: owns a _Version that its items and its own writes bump"""
+    __slots__ = ()
+
+    def _changed(self):
+        self._version._changed()
+
+    def _attach(self, owner):
+        self._version.owners = _add_owner(self._version.owners, owner)
+
+    def _detach(self, owner):
+        self._version.owners = _remove_owner(self._version.owners, owner)
+
+    @property
+    def _owners(self):
+        return self._version.owners
+
+    def _link(self, items: Iterable):
+        """Attach items to this container's counter; done lazily while aggregating"""
+        version = self._version
+        for item in items:
+            if getattr(item, "_owners", version) is not version:
+                item._attach(version)
+
+    def __setstate__(self, state):
+        _set(self, "_version", _Version())
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    def __del__(self):
+        # Items can outlive their container (the GUI wraps the same subjects in a new
+        # Semester on every Calculate). Unlinking each of them here would slow down freeing
+        # every model, so the counter is only marked and _add_owner drops it later.
+        version = self.__dict__.get("_version")
+        if version is not None:
+            version.live = False
+            version.owners = None
+
+
+class _TrackedList(list):
+    """A copy of a container's item list that bumps the container's counter when mutated.
+
+    Items are attached to the counter lazily, the first time the container
+    aggregates them, so building a model costs no more than a list copy.
+    """
+    __slots__ = ("_version",)
+
+    def __init__(self, items=(), version: Optional[_Version] = None):
+        super().__init__(items)
+        self._version = version
+
+    def _replaced(self, removed, added):
+        version = self._version
+        if version is None:
+            return
+        for item in removed:
+            if getattr(item, "_owners", None) is not None:
+                item._detach(version)
+        version._changed()
+
+    def _release(self):
+        """Detach all items from the counter when the list is replaced"""
+        self._replaced(list(self), ())
+        self._version = None
+
+    def append(self, item):
+        super().append(item)
+        self._replaced((), (item,))
+
+    def extend(self, items):
+        items = list(items)
+        super().extend(items)
+        self._replaced((), items)
+
+    def __iadd__(self, items):
+        self.extend(items)
+        return self
+
+    def __imul__(self, n):
+        removed = list(self)
+        super().__imul__(n)
+        self._replaced(removed, list(self))
+        return self
+
+    def insert(self, index, item):
+        super().insert(index, item)
+        self._replaced((), (item,))
+
+    def remove(self, item):
+        del self[self.index(item)]
+
+    def pop(self, index=-1):
+        item = super().pop(index)
+        self._replaced((item,), ())
+        return item
+
+    def clear(self):
+        removed = list(self)
+        super().clear()
+        self._replaced(removed, ())
+
+    def __setitem__(self, key, value):
+        if isinstance(key, slice):
+            removed = super().__getitem__(key)
+            value = list(value)
+            super().__setitem__(key, value)
+            self._replaced(removed, value)
+        else:
+            removed = super().__getitem__(key)
+            super().__setitem__(key, value)
+            self._replaced((removed,), (value,))
+
+    def __delitem__(self, key):
+        removed = super().__getitem__(key)
+        super().__delitem__(key)
+        self._replaced(removed if isinstance(key, slice) else (removed,), ())
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self._replaced((), ())
+
+    def reverse(self):
+        super().reverse()
+        self._replaced((), ())
+
+    def __reduce_ex__(self, protocol):
+        # Copies and pickles are plain lists; the owning object re-wraps them
+        return (list, (list(self),))
+
+
+class _ComponentMetrics:
+    """Derived component figures, shared by Component and ComponentRow"""
+    __slots__ = ()
 
     @property
     def my_percentage(self) -> float:
@@ -33,72 +251,677 @@ class Component:
         return (self.my_marks - self.class_avg_marks) / self.class_avg_marks
 
 
-@dataclass
-class Subject:
+@dataclass(init=False)
+class Component(_Tracked, _ComponentMetrics):
+    __slots__ = ("name", "weight", "max_marks", "my_marks", "class_avg_marks", "_owners")
+
+    name: str
+    weight: float  # Weight as a percentage (0-100)
+    max_marks: float
+    my_marks: float
+    class_avg_marks: float
+
+    _tracked_fields = frozenset({"weight", "max_marks", "my_marks", "class_avg_marks"})
+
+    def __init__(self, name: str, weight: float, max_marks: float, my_marks: float, class_avg_marks: float):
+        # Nothing holds a new component yet, so its fields are set without change tracking
+        _set(self, "name", name)
+        _set(self, "weight", weight)
+        _set(self, "max_marks", max_marks)
+        _set(self, "my_marks", my_marks)
+        _set(self, "class_avg_marks", class_avg_marks)
+        _set(self, "_owners", None)
+
+
+class ComponentRow(_Tracked, _ComponentMetrics):
+    """A Component-compatible view of one row of a ComponentTable.
+
+    Views hold no state of their own: the row's owner links live in the table,
+    so a write through any view of a row reaches the subjects holding it.
+    """
+    __slots__ = ("_table", "_index")
+
+    _tracked_fields = frozenset({"weight", "max_marks", "my_marks", "class_avg_marks"})
+
+    def __init__(self, table: "ComponentTable", index: int):
+        _set(self, "_table", table)
+        _set(self, "_index", index)
+
+    def _column_property(column: str):
+        def getter(self):
+            return getattr(self._table, column)[self._index]
+
+        def setter(self, value):
+            getattr(self._table, column)[self._index] = value
+
+        return property(getter, setter)
+
+    # Writes go to the raw columns; _Tracked.__setattr__ then notifies the row's owners
+    name = _column_property("names")
+    weight = _column_property("_weight")
+    max_marks = _column_property("_max_marks")
+    my_marks = _column_property("_my_marks")
+    class_avg_marks = _column_property("_class_avg_marks")
+    del _column_property
+
+    @property
+    def _owners(self):
+        return self._table._owners[self._index]
+
+    def _attach(self, owner):
+        owners = self._table._owners
+        owners[self._index] = _add_owner(owners[self._index], owner)
+
+    def _detach(self, owner):
+        owners = self._table._owners
+        owners[self._index] = _remove_owner(owners[self._index], owner)
+
+    def __eq__(self, other):
+        if not isinstance(other, ComponentRow):
+            return NotImplemented
+        return self._table is other._table and self._index == other._index
+
+    def __hash__(self):
+        return hash((id(self._table), self._index))
+
+    def to_component(self) -> Component:
+        """Copy this row out into a standalone Component"""
+        return Component(self.name, self.weight, self.max_marks, self.my_marks, self.class_avg_marks)
+
+    def __reduce__(self):
+        # Rows travel (e.g. to worker processes) as plain Components
+        return (Component, (self.name, self.weight, self.max_marks, self.my_marks, self.class_avg_marks))
+
+    def __repr__(self):
+        return (f"ComponentRow(name={self.name!r}, weight={self.weight!r}, max_marks={self.max_marks!r}, "
+                f"my_marks={self.my_marks!r}, class_avg_marks={self.class_avg_marks!r})")
+
+
+class _TableColumn:
+    """A marks column of a ComponentTable; a write bumps the counters of the subjects
+    holding the row, as a write through a ComponentRow does"""
+    __slots__ = ("_data", "_owners")
+
+    def __init__(self, data: array, owners: list):
+        self._data = data
+        self._owners = owners
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __getitem__(self, index):
+        return self._data[index]
+
+    def __setitem__(self, index, value):
+        data, owners = self._data, self._owners
+        if isinstance(index, slice):
+            rows = range(*index.indices(len(data)))
+            value = array("d", value)
+            if len(value) != len(rows):
+                raise ValueError("Assigning to a column slice cannot change the number of rows")
+            data[index] = value
+            for i in rows:
+                _notify(owners[i])
+        else:
+            data[index] = value
+            _notify(owners[index])
+
+    def tolist(self) -> List[float]:
+        return self._data.tolist()
+
+    def __array__(self, dtype=None, copy=None):
+        import numpy as np
+        # A copy: a view of the buffer could be written without invalidating anything
+        return np.array(self._data, dtype=dtype)
+
+    def __repr__(self):
+        return f"_TableColumn({self._data.tolist()!r})"
+
+
+class ComponentTable:
+    """Column store for large numbers of components.
+
+    Marks are held in contiguous array('d') columns instead of one object per
+    component. Single rows are handed out as ComponentRow views, created on
+    demand; rows(start, stop) gives a ComponentSlice that a Subject uses as its
+    components without creating a view per row. The marks columns are exposed
+    as views, so writing table.my_marks[i] invalidates the subjects holding row i.
+    """
+    def __init__(self, components: Iterable = ()):
+        self.names: List[str] = []
+        self._weight = array("d")
+        self._max_marks = array("d")
+        self._my_marks = array("d")
+        self._class_avg_marks = array("d")
+        self._owners: list = []  # Per row: counters of the subjects holding it, as in _Tracked
+        self.extend(components)
+
+    def _column_view(column: str):
+        def getter(self):
+            return _TableColumn(getattr(self, column), self._owners)
+
+        return property(getter)
+
+    weight = _column_view("_weight")
+    max_marks = _column_view("_max_marks")
+    my_marks = _column_view("_my_marks")
+    class_avg_marks = _column_view("_class_avg_marks")
+    del _column_view
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def append(self, name: str, weight: float, max_marks: float, my_marks: float,
+               class_avg_marks: float) -> int:
+        """Add a row and return its index"""
+        self.names.append(name)
+        self._weight.append(weight)
+        self._max_marks.append(max_marks)
+        self._my_marks.append(my_marks)
+        self._class_avg_marks.append(class_avg_marks)
+        self._owners.append(None)
+        return len(self.names) - 1
+
+    def add(self, component) -> int:
+        """Copy a Component (or any object with the same fields) into the table"""
+        return self.append(component.name, component.weight, component.max_marks,
+                           component.my_marks, component.class_avg_marks)
+
+    def extend(self, components: Iterable):
+        for component in components:
+            self.add(component)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [ComponentRow(self, i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self.names):
+            raise IndexError("ComponentTable index out of range")
+        return ComponentRow(self, index)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield ComponentRow(self, i)
+
+    def rows(self, start: int = 0, stop: Optional[int] = None) -> "ComponentSlice":
+        """A contiguous range of rows, e.g. one subject's components"""
+        start, stop, _ = slice(start, stop).indices(len(self))
+        return ComponentSlice(self, start, max(start, stop))
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state["_owners"] = [None] * len(self.names)
+        return state
+
+
+class ComponentSlice:
+    """Rows start to stop of a ComponentTable, used as a subject's components.
+
+    A Subject keeps a slice as it is instead of copying it into a list, so a
+    subject costs nothing per component beyond the table's own columns. Rows
+    are edited through the views the slice hands out. Adding, removing or
+    reordering components switches the slice to a tracked list of those views,
+    as the components then no longer form a range of the table.
+    """
+    __slots__ = ("table", "start", "stop", "_version", "_items")
+
+    def __init__(self, table: ComponentTable, start: int, stop: int, version: Optional[_Version] = None):
+        self.table = table
+        self.start = start
+        self.stop = stop
+        self._version = version
+        self._items: Optional[_TrackedList] = None  # Set once the slice is changed structurally
+
+    def __len__(self) -> int:
+        if self._items is not None:
+            return len(self._items)
+        return self.stop - self.start
+
+    def __getitem__(self, index):
+        if self._items is not None:
+            return self._items[index]
+        if isinstance(index, slice):
+            return [ComponentRow(self.table, self.start + i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("ComponentSlice index out of range")
+        return ComponentRow(self.table, self.start + index)
+
+    def __iter__(self):
+        if self._items is not None:
+            yield from self._items
+            return
+        table = self.table
+        for i in range(self.start, self.stop):
+            yield ComponentRow(table, i)
+
+    def __eq__(self, other):
+        if isinstance(other, ComponentSlice):
+            return list(self) == list(other)
+        if isinstance(other, list):
+            return list(self) == other
+        return NotImplemented
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def index(self, item, *args) -> int:
+        return list(self).index(item, *args)
+
+    def count(self, item) -> int:
+        return list(self).count(item)
+
+    def copy(self) -> list:
+        return list(self)
+
+    def _as_list(self) -> _TrackedList:
+        """The components as a tracked list, created on the first structural change"""
+        if self._items is None:
+            self._items = _TrackedList(
+                [ComponentRow(self.table, i) for i in range(self.start, self.stop)], self._version
+            )
+        return self._items
+
+    def _list_method(name: str):
+        def method(self, *args, **kwargs):
+            return getattr(self._as_list(), name)(*args, **kwargs)
+
+        method.__name__ = name
+        return method
+
+    append = _list_method("append")
+    extend = _list_method("extend")
+    insert = _list_method("insert")
+    remove = _list_method("remove")
+    pop = _list_method("pop")
+    clear = _list_method("clear")
+    sort = _list_method("sort")
+    reverse = _list_method("reverse")
+    __setitem__ = _list_method("__setitem__")
+    __delitem__ = _list_method("__delitem__")
+    del _list_method
+
+    def __iadd__(self, items):
+        self.extend(items)
+        return self
+
+    def __imul__(self, n):
+        self._as_list().__imul__(n)
+        return self
+
+    def _bind(self, version: _Version):
+        """The same components, tracked by a subject's counter"""
+        if self._items is not None:
+            return _TrackedList(self._items, version)
+        return ComponentSlice(self.table, self.start, self.stop, version)
+
+    def _release(self):
+        """Detach the rows from the counter when the subject's components are replaced"""
+        version, owners = self._version, self.table._owners
+        if version is None:
+            return
+        if self._items is not None:
+            self._items._release()
+        else:
+            for i in range(self.start, self.stop):
+                if owners[i] is not None:
+                    owners[i] = _remove_owner(owners[i], version)
+        self._version = None
+
+    def _totals(self) -> tuple:
+        """Subject totals straight from the table columns, linking each row to the counter"""
+        if self._items is not None:
+            return _component_totals(self._items, self._version)
+        table, version, owners = self.table, self._version, self.table._owners
+        weight, max_marks, my_marks, class_avg = table._weight, table._max_marks, table._my_marks, table._class_avg_marks
+        total_my = total_max = total_class = weighted_my = weighted_class = 0
+        for i in range(self.start, self.stop):
+            if owners[i] is not version:
+                owners[i] = _add_owner(owners[i], version)
+            my, maximum, avg, w = my_marks[i], max_marks[i], class_avg[i], weight[i]
+            # Same arithmetic, in the same order, as summing Component properties
+            total_my += my
+            total_max += maximum
+            total_class += avg
+            weighted_my += (my / maximum) * w
+            weighted_class += (avg / maximum) * w
+        return total_my, total_max, total_class, weighted_my, weighted_class
+
+    def __reduce__(self):
+        # Copies and pickles are plain lists of Components; the owning Subject re-wraps them
+        return (list, ([comp.to_component() if type(comp) is ComponentRow else comp for comp in self],))
+
+
+def _component_totals(components, version: _Version) -> tuple:
+    """Subject totals of a list of components, linking each to the counter"""
+    total_my = total_max = total_class = weighted_my = weighted_class = 0
+    for comp in components:
+        # Components are linked to the counter the first time they are aggregated
+        if getattr(comp, "_owners", version) is not version:
+            comp._attach(version)
+        total_my += comp.my_marks
+        total_max += comp.max_marks
+        total_class += comp.class_avg_marks
+        weighted_my += comp.weighted_my_score
+        weighted_class += comp.weighted_class_avg
+    return total_my, total_max, total_class, weighted_my, weighted_class
+
+
+def _track_components(components, version: _Version):
+    if type(components) is ComponentSlice:
+        return components._bind(version)
+    return _TrackedList(components, version)
+
+
+@dataclass(init=False)
+class Subject(_TrackedContainer):
+    """A subject and its components.
+
+    components is stored as a tracked copy of the list passed in: change the
+    subject's components through subject.components, not through the original
+    list, so that cached aggregates see the change. A ComponentSlice from
+    ComponentTable.rows is kept as it is rather than copied.
+    """
     name: str
     credit_hours: float
     components: List[Component] = field(default_factory=list)
+
+    _tracked_fields = frozenset({"credit_hours", "components"})
+    # Caches hold the counter value they were computed at
+    _aggregates = None
+    _grade = None
+
+    def __init__(self, name: str, credit_hours: float, components: Iterable[Component] = ()):
+        version = _Version()
+        _set(self, "_version", version)
+        _set(self, "name", name)
+        _set(self, "credit_hours", credit_hours)
+        _set(self, "components", _track_components(components, version))
+
+    def __setattr__(self, name, value):
+        if name == "components":
+            old = getattr(self, "components", None)
+            if isinstance(old, (_TrackedList, ComponentSlice)):
+                old._release()
+            value = _track_components(value, self._version)
+        super().__setattr__(name, value)
+
+    def _get_aggregates(self) -> tuple:
+        """All component totals, computed in a single pass and cached until a change"""
+        version = self._version
+        cached = self._aggregates
+        if cached is None or cached[0] != version.value:
+            stamp = version.value
+            components = self.components
+            if type(components) is ComponentSlice:
+                total_my, total_max, total_class, weighted_my, weighted_class = components._totals()
+            else:
+                total_my, total_max, total_class, weighted_my, weighted_class = _component_totals(components, version)
+            if weighted_class == 0:
+                relative = 0
+            else:
+                relative = (weighted_my - weighted_class) / weighted_class
+            cached = (stamp, (total_my, total_max, total_class, weighted_my, weighted_class, relative))
+            _set(self, "_aggregates", cached)
+        return cached[1]
     
     @property
     def total_my_marks(self) -> float:
-        return sum(comp.my_marks for comp in self.components)
+        return self._get_aggregates()[0]
     
     @property
     def total_max_marks(self) -> float:
-        return sum(comp.max_marks for comp in self.components)
+        return self._get_aggregates()[1]
     
     @property
     def total_class_avg_marks(self) -> float:
-        return sum(comp.class_avg_marks for comp in self.components)
+        return self._get_aggregates()[2]
     
     @property
     def weighted_total_my_score(self) -> float:
-        return sum(comp.weighted_my_score for comp in self.components)
+        return self._get_aggregates()[3]
     
     @property
     def weighted_total_class_avg(self) -> float:
-        return sum(comp.weighted_class_avg for comp in self.components)
+        return self._get_aggregates()[4]
     
     @property
     def overall_relative_performance(self) -> float:
-        if self.weighted_total_class_avg == 0:
-            return 0
-        return (self.weighted_total_my_score - self.weighted_total_class_avg) / self.weighted_total_class_avg
+        return self._get_aggregates()[5]
+
+    def predict_grade(self, grade_scale: "GradeScale") -> tuple:
+        """Predicted (grade_letter, grade_points), cached per compiled grade scale"""
+        compiled = grade_scale.compile()
+        cached = self._grade
+        if cached is None or cached[0] is not compiled or cached[1] != self._version.value:
+            stamp = self._version.value
+            cached = (compiled, stamp, compiled.predict_grade(self.overall_relative_performance))
+            _set(self, "_grade", cached)
+        return cached[2]
+
+    def _component_indices(self, components: Iterable[Union[int, str]]) -> List[int]:
+        """Resolve component positions (negative ones count from the end) or names to
+        positions, in order and without duplicates"""
+        names = [comp.name for comp in self.components]
+        count = len(names)
+        indices = []
+        for component in components:
+            if isinstance(component, str):
+                if component not in names:
+                    raise ValueError(f"No component named {component!r} in {self.name}")
+                index = names.index(component)
+            else:
+                index = component + count if component < 0 else component
+                if not 0 <= index < count:
+                    raise ValueError(f"Component index {component} is out of range for {self.name}")
+            if index not in indices:
+                indices.append(index)
+        return indices
+
+    def _relative_with(self, pending: Set[int], fraction: float) -> float:
+        """overall_relative_performance with the given share of max marks scored on the pending components"""
+        weighted_my = 0
+        for i, comp in enumerate(self.components):
+            my_marks = fraction * comp.max_marks if i in pending else comp.my_marks
+            weighted_my += (my_marks / comp.max_marks) * comp.weight
+        class_total = self.weighted_total_class_avg
+        return (weighted_my - class_total) / class_total
+
+    def marks_needed(self, grade_scale: "GradeScale", pending: Iterable[Union[int, str]]) -> List["MarksNeeded"]:
+        """Minimum marks on the pending components to reach each grade, best grade first.
+
+        Inverts overall_relative_performance >= threshold in closed form, assuming the
+        same share of max marks is scored on every pending component. The marks already
+        entered for pending components are ignored; their class averages should hold
+        the expected averages. pending holds positions, negative ones counting from the
+        end, or names; each component is counted once, and unknown ones raise ValueError.
+        """
+        pending_indices = self._component_indices(pending)
+        pending_set = set(pending_indices)
+        known_score = sum(comp.weighted_my_score for i, comp in enumerate(self.components)
+                          if i not in pending_set)
+        pending_weight = sum(self.components[i].weight for i in pending_indices)
+        class_total = self.weighted_total_class_avg
+
+        compiled = grade_scale.compile()
+        results = []
+        for index in reversed(range(len(compiled.grades))):
+            threshold = compiled.thresholds[index]
+            if index == 0:
+                fraction = 0.0  # The lowest grade is the fallback, reached with any score
+            elif class_total == 0:
+                fraction = 0.0 if threshold <= 0 else math.inf  # Relative performance is fixed at 0
+            else:
+                # rp >= t  <=>  known_score + fraction * pending_weight >= (1 + t) * class_total
+                shortfall = (1 + threshold) * class_total - known_score
+                if shortfall <= 0:
+                    fraction = 0.0
+                elif pending_weight > 0:
+                    fraction = shortfall / pending_weight
+                else:
+                    fraction = math.inf
+                # The closed form can land a rounding error below the threshold; step up
+                # until the marks it gives actually earn the grade
+                step = math.ulp(fraction or 1.0)
+                while fraction <= 1 and compiled.grade_index(self._relative_with(pending_set, fraction)) < index:
+                    fraction += step
+                    step *= 2
+            letter, points = compiled.grades[index]
+            results.append(MarksNeeded(
+                letter, points, fraction,
+                [fraction * self.components[i].max_marks for i in pending_indices] if fraction <= 1 else None
+            ))
+        return results
+
+
+@dataclass
+class MarksNeeded:
+    """Result of Subject.marks_needed for one grade"""
+    grade: str
+    grade_points: float
+    fraction: float  # Share of max marks needed on each pending component; inf if unreachable
+    marks: Optional[List[float]]  # Marks needed per pending component, None if unreachable
+
+    @property
+    def reachable(self) -> bool:
+        return self.fraction <= 1
+
+
+class CompiledGradeScale:
+    """A GradeScale with its thresholds sorted once for O(log n) lookups"""
+    def __init__(self, thresholds: Dict[float, tuple]):
+        self.source = thresholds
+        self.thresholds = sorted(thresholds)  # Ascending
+        self.grades = [thresholds[t] for t in self.thresholds]
+
+    def grade_index(self, relative_performance: float) -> int:
+        """Index into self.grades of the grade for a relative performance"""
+        if relative_performance != relative_performance:
+            return 0  # NaN never meets a threshold
+        # The highest threshold not above the value; below all of them means the lowest grade
+        return max(bisect_right(self.thresholds, relative_performance) - 1, 0)
+
+    def predict_grade(self, relative_performance: float) -> tuple:
+        """Returns a tuple of (grade_letter, grade_points) based on relative performance"""
+        return self.grades[self.grade_index(relative_performance)]
+
+    def grade_indices(self, values: Iterable[float]):
+        """Vectorized grade_index over an array of relative performances"""
+        try:
+            import numpy as np
+        except ImportError:
+            return [self.grade_index(value) for value in values]
+        values = np.asarray(values, dtype=np.float64)
+        indices = np.searchsorted(np.asarray(self.thresholds, dtype=np.float64), values, side="right") - 1
+        indices[(indices < 0) | np.isnan(values)] = 0
+        return indices
+
+    def predict_many(self, values: Iterable[float]) -> List[tuple]:
+        """Grade a whole array of relative performances at once"""
+        indices = self.grade_indices(values)
+        if hasattr(indices, "tolist"):
+            indices = indices.tolist()
+        return [self.grades[i] for i in indices]
 
 
 @dataclass
 class GradeScale:
-    thresholds: Dict[float, tuple]
+    """thresholds is stored as a read-only copy; assign a new mapping to change the scale"""
+    thresholds: Mapping[float, tuple]
+    _compiled: Optional[CompiledGradeScale] = field(default=None, init=False, repr=False, compare=False)
+
+    def __setattr__(self, name, value):
+        if name == "thresholds":
+            # An in-place edit would leave the compiled scale, and every cache keyed on it, stale
+            value = MappingProxyType(dict(value))
+        _set(self, name, value)
+
+    def __reduce__(self):
+        return (type(self), (dict(self.thresholds),))
+    
+    def compile(self) -> CompiledGradeScale:
+        """Return the compiled form of this scale, building it on first use"""
+        # Rebuilt when thresholds is reassigned, which is the only way it can change
+        if self._compiled is None or self._compiled.source is not self.thresholds:
+            self._compiled = CompiledGradeScale(self.thresholds)
+        return self._compiled
     
     def predict_grade(self, relative_performance: float) -> tuple:
         """Returns a tuple of (grade_letter, grade_points) based on relative performance"""
-        for threshold, grade in sorted(self.thresholds.items(), reverse=True):
-            if relative_performance >= threshold:
-                return grade
-        # If no threshold is met, return the lowest grade
-        return self.thresholds[min(self.thresholds.keys())]
+        return self.compile().predict_grade(relative_performance)
+    
+    def predict_many(self, values: Iterable[float]) -> List[tuple]:
+        """Grade an array of relative performances in one vectorized call"""
+        return self.compile().predict_many(values)
 
 
-@dataclass
-class Semester:
+@dataclass(init=False)
+class Semester(_TrackedContainer):
+    """A semester's subjects; subjects is stored as a tracked copy, like Subject.components"""
     name: str
     subjects: List[Subject] = field(default_factory=list)
     previous_cgpa: Optional[float] = None
     previous_credits: Optional[float] = None
+
+    _tracked_fields = frozenset({"subjects"})
+    _total_credits = None
+    _sgpa = None
+
+    def __init__(self, name: str, subjects: Iterable[Subject] = (), previous_cgpa: Optional[float] = None,
+                 previous_credits: Optional[float] = None):
+        version = _Version()
+        _set(self, "_version", version)
+        _set(self, "name", name)
+        _set(self, "subjects", _TrackedList(subjects, version))
+        _set(self, "previous_cgpa", previous_cgpa)
+        _set(self, "previous_credits", previous_credits)
+
+    def __setattr__(self, name, value):
+        if name == "subjects":
+            old = getattr(self, "subjects", None)
+            if isinstance(old, _TrackedList):
+                old._release()
+            value = _TrackedList(value, self._version)
+        super().__setattr__(name, value)
+
+    @property
+    def total_credits(self) -> float:
+        version = self._version
+        cached = self._total_credits
+        if cached is None or cached[0] != version.value:
+            stamp = version.value
+            # Subjects are linked to the counter the first time they are summed
+            self._link(self.subjects)
+            cached = (stamp, sum(subject.credit_hours for subject in self.subjects))
+            _set(self, "_total_credits", cached)
+        return cached[1]
     
     def calculate_sgpa(self, grade_scale: GradeScale) -> float:
         """Calculate SGPA for the semester"""
+        compiled = grade_scale.compile()
+        cached = self._sgpa
+        if cached is not None and cached[0] is compiled and cached[1] == self._version.value:
+            return cached[2]
+
+        stamp = self._version.value
         total_credit_points = 0
-        total_credits = sum(subject.credit_hours for subject in self.subjects)
+        total_credits = self.total_credits
         
         if total_credits == 0:
-            return 0
-        
-        for subject in self.subjects:
-            _, grade_points = grade_scale.predict_grade(subject.overall_relative_performance)
-            total_credit_points += grade_points * subject.credit_hours
-            
-        return total_credit_points / total_credits
+            sgpa = 0
+        else:
+            for subject in self.subjects:
+                _, grade_points = subject.predict_grade(grade_scale)
+                total_credit_points += grade_points * subject.credit_hours
+            sgpa = total_credit_points / total_credits
+
+        _set(self, "_sgpa", (compiled, stamp, sgpa))
+        return sgpa
     
     def calculate_cgpa(self, grade_scale: GradeScale) -> float:
         """Calculate CGPA including previous semesters if available"""
@@ -106,9 +929,124 @@ class Semester:
             return self.calculate_sgpa(grade_scale)
         
         sgpa = self.calculate_sgpa(grade_scale)
-        current_credits = sum(subject.credit_hours for subject in self.subjects)
+        current_credits = self.total_credits
         
         total_credits = self.previous_credits + current_credits
         total_points = (self.previous_cgpa * self.previous_credits) + (sgpa * current_credits)
         
         return total_points / total_credits
+
+
+class _TermLink:
+    """Parent link from a semester back to its position in a Transcript"""
+    __slots__ = ("transcript", "index")
+
+    def __init__(self, transcript: "Transcript", index: int):
+        self.transcript = weakref.ref(transcript)
+        self.index = index
+
+    def _changed(self):
+        transcript = self.transcript()
+        if transcript is not None:
+            transcript._term_changed(self.index)
+
+
+class Transcript:
+    """An ordered series of semesters with running prefix sums of credit points and credits.
+
+    Appending a term is O(1). Replacing or editing term k only marks the sums from k
+    onwards as stale; they are repaired on the next query, after which CGPA as of
+    any term is O(1).
+    """
+    def __init__(self, grade_scale: GradeScale, semesters: Iterable[Semester] = (),
+                 previous_cgpa: Optional[float] = None, previous_credits: Optional[float] = None):
+        self.grade_scale = grade_scale
+        self._compiled = grade_scale.compile()
+        self._semesters: List[Semester] = []
+        self._links: List[_TermLink] = []
+        # _points[k] and _credits[k] are the totals over the first k terms
+        base_credits = previous_credits if previous_cgpa is not None and previous_credits is not None else 0.0
+        self._points = array("d", [previous_cgpa * base_credits if base_credits else 0.0])
+        self._credits = array("d", [base_credits])
+        self._valid = 0  # Number of terms whose prefix sums are up to date
+        for semester in semesters:
+            self.append(semester)
+
+    def __len__(self) -> int:
+        return len(self._semesters)
+
+    def __getitem__(self, index: int) -> Semester:
+        return self._semesters[index]
+
+    def __iter__(self):
+        return iter(self._semesters)
+
+    def _term_changed(self, index: int):
+        self._valid = min(self._valid, index)
+
+    def _term_totals(self, semester: Semester) -> tuple:
+        credits = semester.total_credits
+        return semester.calculate_sgpa(self.grade_scale) * credits, credits
+
+    def append(self, semester: Semester):
+        index = len(self._semesters)
+        link = _TermLink(self, index)
+        semester._attach(link)
+        self._semesters.append(semester)
+        self._links.append(link)
+        if self._valid == index:
+            points, credits = self._term_totals(semester)
+            self._points.append(self._points[-1] + points)
+            self._credits.append(self._credits[-1] + credits)
+            self._valid += 1
+        else:
+            self._points.append(0.0)
+            self._credits.append(0.0)
+
+    def replace(self, index: int, semester: Semester):
+        """Re-grade a term with a new version of its semester"""
+        index = range(len(self._semesters))[index]
+        self._semesters[index]._detach(self._links[index])
+        semester._attach(self._links[index])
+        self._semesters[index] = semester
+        self._term_changed(index)
+
+    def pop(self) -> Semester:
+        """Remove and return the latest term"""
+        semester = self._semesters.pop()
+        semester._detach(self._links.pop())
+        self._points.pop()
+        self._credits.pop()
+        self._valid = min(self._valid, len(self._semesters))
+        return semester
+
+    def _repair(self):
+        compiled = self.grade_scale.compile()
+        if compiled is not self._compiled:
+            self._compiled = compiled
+            self._valid = 0
+        # Cached SGPAs make this a pass of additions over the stale terms only
+        for k in range(self._valid, len(self._semesters)):
+            points, credits = self._term_totals(self._semesters[k])
+            self._points[k + 1] = self._points[k] + points
+            self._credits[k + 1] = self._credits[k] + credits
+        self._valid = len(self._semesters)
+
+    def totals(self, count: Optional[int] = None) -> tuple:
+        """(credit_points, credits) over the first count terms, default all of them"""
+        if count is None:
+            count = len(self._semesters)
+        if not 0 <= count <= len(self._semesters):
+            raise IndexError("Transcript term count out of range")
+        if self._valid < count or self._compiled is not self.grade_scale.compile():
+            self._repair()
+        return self._points[count], self._credits[count]
+
+    def cgpa(self, term: int = -1) -> float:
+        """CGPA as of the given term (inclusive), the latest by default"""
+        if self._semesters:
+            term = range(len(self._semesters))[term]
+        elif term != -1:
+            raise IndexError("Transcript term out of range")
+        points, credits = self.totals(term + 1)
+        return points / credits if credits else 0
@@ -0,0 +1,91 @@
+import os
+from collections import deque
+from functools import partial
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from models import GradeScale, Semester
+from calculator import generate_semester_summary
+from profiling import active_profiler
+
+DEFAULT_CHUNK_SIZE = 256
+
+
+def _chunks(items: Iterable, chunk_size: int) -> Iterator[List]:
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _apply_chunk(func: Callable, chunk: List) -> List:
+    return [func(item) for item in chunk]
+
+
+def _apply_chunk_profiled(func: Callable, chunk: List, memory: bool) -> Tuple[List, List]:
+    """_apply_chunk under a profiler in the worker; returns the results and its stage stats"""
+    from profiling import Profiler
+    with Profiler(memory) as profiler:
+        results = [func(item) for item in chunk]
+    return results, list(profiler.stages.values())
+
+
+def resolve_workers(workers: Optional[int]) -> int:
+    """None or 0 means one worker per CPU core"""
+    if not workers:
+        return os.cpu_count() or 1
+    return workers
+
+
+def parallel_map(func: Callable, items: Iterable, workers: Optional[int] = None,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator:
+    """Apply func to every item on a process pool, yielding results in input order.
+
+    Items are sent to the workers in chunks of chunk_size. Only a bounded number
+    of chunks is in flight at once, so an unbounded input stream is consumed
+    lazily. func and the items must be picklable.
+    """
+    workers = resolve_workers(workers)
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    if workers == 1:
+        # No pool overhead when a single core was asked for
+        yield from map(func, items)
+        return
+
+    # Imported here so single-worker runs never pay for multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    # Stages run in the workers are timed there and merged into the parent's profiler
+    profiler = active_profiler()
+    if profiler is None:
+        apply, collect = partial(_apply_chunk, func), lambda results: results
+    else:
+        apply = partial(_apply_chunk_profiled, func, memory=profiler.memory)
+
+        def collect(result):
+            results, stages = result
+            profiler.merge(stages)
+            return results
+
+    max_in_flight = workers * 2
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for chunk in _chunks(items, chunk_size):
+            pending.append(executor.submit(apply, chunk))
+            if len(pending) >= max_in_flight:
+                yield from collect(pending.popleft().result())
+        while pending:
+            yield from collect(pending.popleft().result())
+
+
+def parallel_semester_summaries(semesters: Iterable[Semester], grade_scale: GradeScale,
+                                workers: Optional[int] = None,
+                                chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Dict]:
+    """generate_semester_summary for every semester, spread over all cores"""
+    return parallel_map(
+        partial(generate_semester_summary, grade_scale=grade_scale),
+        semesters, workers, chunk_size
+    )
@@ -0,0 +1,43 @@
+from typing import Dict, List, Optional, Tuple
+
+# Define common presets
+SUBJECT_PRESETS = {
+    "Standard Academic": [
+        {"name": "Quizzes", "weight": 10, "count": 4, "is_group": True},
+        {"name": "Assignments", "weight": 10, "count": 2, "is_group": True},
+        {"name": "Mid-Semester Exam", "weight": 30, "count": 1, "is_group": False},
+        {"name": "End-Semester Exam", "weight": 50, "count": 1, "is_group": False},
+    ],
+    "Lab Course": [
+        {"name": "Lab Reports", "weight": 30, "count": 8, "is_group": True},
+        {"name": "Lab Performance", "weight": 30, "count": 1, "is_group": False},
+        {"name": "Lab Project", "weight": 20, "count": 1, "is_group": False},
+        {"name": "Lab Exam", "weight": 20, "count": 1, "is_group": False},
+    ],
+    "Project Based": [
+        {"name": "Progress Reports", "weight": 20, "count": 3, "is_group": True},
+        {"name": "Presentations", "weight": 30, "count": 2, "is_group": True},
+        {"name": "Final Project", "weight": 40, "count": 1, "is_group": False},
+        {"name": "Peer Review", "weight": 10, "count": 1, "is_group": False},
+    ],
+    "Custom": []  # Empty preset for manual entry
+}
+
+
+def expand_preset(preset_name: str, group_counts: Optional[Dict[str, int]] = None) -> List[Tuple[str, float]]:
+    """List the (component_name, weight) pairs a preset produces.
+
+    Groups are split into numbered components with equal weight, the way
+    SubjectDialog.apply_preset does. group_counts overrides a group's count.
+    """
+    components = []
+    for preset_comp in SUBJECT_PRESETS[preset_name]:
+        count = preset_comp["count"]
+        if group_counts and preset_comp["name"] in group_counts:
+            count = group_counts[preset_comp["name"]]
+        if preset_comp["is_group"] and count > 1:
+            weight = preset_comp["weight"] / count
+            components.extend((f"{preset_comp['name']} {i+1}", weight) for i in range(count))
+        else:
+            components.append((preset_comp["name"], preset_comp["weight"]))
+    return components
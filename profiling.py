@@ -0,0 +1,229 @@
+"""Stage-level wall time, call count and peak memory instrumentation.
+
+Code marks its stages with
+
+    with stage("summary"):
+        ...
+
+which does nothing unless a Profiler is active. A profiler is activated by
+using it as a context manager; stages entered in that time are aggregated by
+name and reported to any registered hooks as they finish:
+
+    with Profiler() as profiler:
+        run_cli()
+    print(profiler.format_table())
+
+Peak memory is measured with tracemalloc and is the most a stage allocated
+on top of what was allocated when it started, including its nested stages
+and whatever other threads of the process allocated meanwhile. Tracing
+memory slows Python allocation noticeably; Profiler(memory=False) records
+times and counts only. Stages are recorded on the thread that activated the
+profiler. parallel_map profiles its worker processes too and merges their
+stages into the active profiler, so with several workers a stage's total
+time is summed over all of them and can exceed the wall time.
+"""
+import json
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Hooks are called as hook(name, seconds, peak_bytes) when a stage finishes
+StageHook = Callable[[str, float, Optional[int]], None]
+
+PROFILE_OPTION = "--profile"
+
+
+class _NoStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NO_STAGE = _NoStage()
+
+# The active profiler; None when profiling is off
+_active: Optional["Profiler"] = None
+
+
+def active_profiler() -> Optional["Profiler"]:
+    """The active profiler, or None when profiling is off"""
+    return _active
+
+
+def stage(name: str):
+    """Context manager timing one stage, or a shared no-op when profiling is off"""
+    if _active is None:
+        return _NO_STAGE
+    return _active.stage(name)
+
+
+@dataclass
+class StageStats:
+    name: str
+    calls: int = 0
+    seconds: float = 0.0
+    peak_bytes: Optional[int] = None  # None when memory was not traced
+
+
+class _Stage:
+    __slots__ = ("profiler", "name", "start", "start_bytes", "peak")
+
+    def __init__(self, profiler: "Profiler", name: str):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        profiler = self.profiler
+        if threading.get_ident() != profiler._thread:
+            self.start = None
+            return self
+        if profiler.memory:
+            import tracemalloc
+            current, peak = tracemalloc.get_traced_memory()
+            # The enclosing stage's peak so far must survive the reset below
+            if profiler._stack:
+                parent = profiler._stack[-1]
+                parent.peak = max(parent.peak, peak)
+            tracemalloc.reset_peak()
+            self.start_bytes = self.peak = current
+        profiler._stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.start is None:
+            return False
+        elapsed = time.perf_counter() - self.start
+        profiler = self.profiler
+        profiler._stack.pop()
+        peak_bytes = None
+        if profiler.memory:
+            import tracemalloc
+            self.peak = max(self.peak, tracemalloc.get_traced_memory()[1])
+            peak_bytes = self.peak - self.start_bytes
+            if profiler._stack:
+                parent = profiler._stack[-1]
+                parent.peak = max(parent.peak, self.peak)
+            tracemalloc.reset_peak()
+        profiler._record(self.name, elapsed, peak_bytes)
+        return False
+
+
+class Profiler:
+    """Aggregates the stages run while it is active, in order of first use"""
+    def __init__(self, memory: bool = True):
+        self.memory = memory
+        self.stages: Dict[str, StageStats] = {}
+        self.hooks: List[StageHook] = []
+        self._stack: List[_Stage] = []
+        self._thread: Optional[int] = None
+        self._previous: Optional["Profiler"] = None
+        self._started_tracing = False
+
+    def add_hook(self, hook: StageHook):
+        """Call hook(name, seconds, peak_bytes) every time a stage finishes"""
+        self.hooks.append(hook)
+
+    def remove_hook(self, hook: StageHook):
+        self.hooks.remove(hook)
+
+    def stage(self, name: str) -> _Stage:
+        return _Stage(self, name)
+
+    def _record(self, name: str, seconds: float, peak_bytes: Optional[int]):
+        stats = self.stages.get(name)
+        if stats is None:
+            stats = self.stages[name] = StageStats(name)
+        stats.calls += 1
+        stats.seconds += seconds
+        if peak_bytes is not None:
+            stats.peak_bytes = max(stats.peak_bytes or 0, peak_bytes)
+        for hook in self.hooks:
+            hook(name, seconds, peak_bytes)
+
+    def merge(self, stages: Iterable[StageStats]):
+        """Add stage stats recorded elsewhere, e.g. by a profiler in a worker process.
+
+        Calls and times are summed and peaks take the maximum; hooks are not called.
+        """
+        for other in stages:
+            stats = self.stages.get(other.name)
+            if stats is None:
+                stats = self.stages[other.name] = StageStats(other.name)
+            stats.calls += other.calls
+            stats.seconds += other.seconds
+            if other.peak_bytes is not None:
+                stats.peak_bytes = max(stats.peak_bytes or 0, other.peak_bytes)
+
+    def __enter__(self):
+        global _active
+        if self.memory:
+            import tracemalloc
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+        self._thread = threading.get_ident()
+        self._previous, _active = _active, self
+        return self
+
+    def __exit__(self, *exc_info):
+        global _active
+        _active = self._previous
+        self._stack.clear()
+        if self._started_tracing:
+            import tracemalloc
+            tracemalloc.stop()
+            self._started_tracing = False
+        return False
+
+    def as_dict(self) -> Dict:
+        return {"memory_traced": self.memory, "stages": [asdict(stats) for stats in self.stages.values()]}
+
+    def to_json(self) -> str:
+        return json.dumps(self.as_dict(), indent=2)
+
+    def format_table(self) -> str:
+        lines = [f"{'Stage':<20} {'Calls':>9} {'Total ms':>11} {'Mean us':>11} {'Peak KiB':>10}"]
+        for stats in self.stages.values():
+            mean_us = stats.seconds / stats.calls * 1e6 if stats.calls else 0.0
+            peak = f"{stats.peak_bytes / 1024:.1f}" if stats.peak_bytes is not None else "-"
+            lines.append(f"{stats.name:<20} {stats.calls:>9} {stats.seconds * 1000:>11.2f} "
+                         f"{mean_us:>11.1f} {peak:>10}")
+        return "\n".join(lines)
+
+
+def split_profile_option(argv: List[str]) -> Tuple[List[str], Optional[str]]:
+    """Remove --profile or --profile=FILE from argv.
+
+    Returns the remaining arguments and where the report goes: None when the
+    option is absent, "" for a table on stderr, otherwise a JSON file path.
+    """
+    remaining, target = [], None
+    for arg in argv:
+        if arg == PROFILE_OPTION:
+            target = ""
+        elif arg.startswith(PROFILE_OPTION + "="):
+            target = arg[len(PROFILE_OPTION) + 1:]
+        else:
+            remaining.append(arg)
+    return remaining, target
+
+
+def run_profiled(func: Callable, target: str, *args):
+    """Call func(*args) under a Profiler and report it to target as split_profile_option describes"""
+    profiler = Profiler()
+    try:
+        with profiler:
+            return func(*args)
+    finally:
+        if target:
+            with open(target, "w", encoding="utf-8") as f:
+                f.write(profiler.to_json())
+        else:
+            print(profiler.format_table(), file=sys.stderr)
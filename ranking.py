@@ -0,0 +1,260 @@
+"""Rank and percentile of students within each subject of a cohort.
+
+Every subject keeps one sorted index per metric, so rank and percentile
+queries are O(log n) bisections instead of a sort of the cohort. Subjects are
+linked to their ranking like semesters to a Transcript: editing a student's
+component marks marks that student stale, and the indexes are repaired on the
+next query by moving only the stale entries.
+
+Usage: python ranking.py SEMESTERS [-o OUTPUT] [--grade-scale FILE]
+
+reads semesters as JSON Lines with a "student" key, as written by roster.py,
+and writes their summaries with each subject's rank and percentile added.
+"""
+import argparse
+import json
+import sys
+import weakref
+from bisect import bisect_left, bisect_right, insort
+from typing import Callable, Dict, Hashable, Iterable, Iterator, List, Set
+
+from models import GradeScale, Subject, Semester
+from calculator import create_default_grade_scale, generate_semester_summary
+from batch import grade_scale_from_dict, iter_records, semester_from_dict
+
+# Metric name -> value of a subject; higher is better for every metric
+METRICS: Dict[str, Callable[[Subject], float]] = {
+    "relative_performance": lambda subject: subject.overall_relative_performance,
+    "weighted_total": lambda subject: subject.weighted_total_my_score,
+}
+
+
+class SortedIndex:
+    """Values of many keys kept in ascending order.
+
+    Lookups bisect the sorted values; inserting or moving a key is a bisection
+    plus one list insertion or deletion.
+    """
+    def __init__(self):
+        self._values: List[float] = []
+        self._by_key: Dict[Hashable, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __contains__(self, key) -> bool:
+        return key in self._by_key
+
+    def value(self, key) -> float:
+        return self._by_key[key]
+
+    def set(self, key, value: float):
+        """Insert key, or move it to its new value"""
+        old = self._by_key.get(key)
+        if old is not None:
+            if old == value:
+                return
+            del self._values[bisect_left(self._values, old)]
+        self._by_key[key] = value
+        insort(self._values, value)
+
+    def remove(self, key):
+        del self._values[bisect_left(self._values, self._by_key.pop(key))]
+
+    def rank_of(self, value: float) -> int:
+        """1 + the number of values strictly greater; equal values share a rank"""
+        return len(self._values) - bisect_right(self._values, value) + 1
+
+    def percentile_of(self, value: float) -> float:
+        """Percentage of the values at or below value"""
+        if not self._values:
+            return 0.0
+        return bisect_right(self._values, value) / len(self._values) * 100
+
+    def rank(self, key) -> int:
+        return self.rank_of(self._by_key[key])
+
+    def percentile(self, key) -> float:
+        return self.percentile_of(self._by_key[key])
+
+
+class _RankLink:
+    """Parent link from a subject back to its student's entry in a SubjectRanking"""
+    __slots__ = ("ranking", "student")
+
+    def __init__(self, ranking: "SubjectRanking", student: Hashable):
+        self.ranking = weakref.ref(ranking)
+        self.student = student
+
+    def _changed(self):
+        ranking = self.ranking()
+        if ranking is not None:
+            ranking._stale.add(self.student)
+
+
+class SubjectRanking:
+    """Every student's standing in one subject, by each of METRICS"""
+    def __init__(self, name: str):
+        self.name = name
+        self.indexes: Dict[str, SortedIndex] = {metric: SortedIndex() for metric in METRICS}
+        self._subjects: Dict[Hashable, Subject] = {}
+        self._links: Dict[Hashable, _RankLink] = {}
+        self._stale: Set[Hashable] = set()
+
+    def __len__(self) -> int:
+        return len(self._subjects)
+
+    def __contains__(self, student) -> bool:
+        return student in self._subjects
+
+    def add(self, student: Hashable, subject: Subject):
+        """Rank a student's subject, replacing any earlier one of the same student"""
+        if student in self._subjects:
+            self._subjects[student]._detach(self._links[student])
+        link = self._links.get(student)
+        if link is None:
+            link = self._links[student] = _RankLink(self, student)
+        subject._attach(link)
+        self._subjects[student] = subject
+        self._stale.discard(student)
+        self._index(student, subject)
+
+    def remove(self, student: Hashable):
+        self._subjects.pop(student)._detach(self._links.pop(student))
+        self._stale.discard(student)
+        for index in self.indexes.values():
+            index.remove(student)
+
+    def _index(self, student: Hashable, subject: Subject):
+        for metric, value in METRICS.items():
+            self.indexes[metric].set(student, value(subject))
+
+    def _repair(self):
+        # Cached aggregates make re-reading an unchanged metric cheap
+        while self._stale:
+            student = self._stale.pop()
+            self._index(student, self._subjects[student])
+
+    def _metric_index(self, metric: str) -> SortedIndex:
+        if metric not in self.indexes:
+            raise ValueError(f"Unknown ranking metric: {metric}")
+        if self._stale:
+            self._repair()
+        return self.indexes[metric]
+
+    def rank(self, student: Hashable, metric: str = "relative_performance") -> int:
+        """1 for the best student; students with equal values share a rank"""
+        return self._metric_index(metric).rank(student)
+
+    def percentile(self, student: Hashable, metric: str = "relative_performance") -> float:
+        return self._metric_index(metric).percentile(student)
+
+    def rank_of(self, value: float, metric: str = "relative_performance") -> int:
+        """Rank a value would have, e.g. for a what-if score that is not in the index"""
+        return self._metric_index(metric).rank_of(value)
+
+    def standing(self, student: Hashable) -> Dict:
+        """Value, rank and percentile of a student by every metric"""
+        result = {"students": len(self._subjects)}
+        for metric in METRICS:
+            index = self._metric_index(metric)
+            value = index.value(student)
+            result[metric] = {"value": value, "rank": index.rank_of(value), "percentile": index.percentile_of(value)}
+        return result
+
+
+class CohortRanking:
+    """Subject rankings of a whole cohort, keyed by subject name"""
+    def __init__(self):
+        self.subjects: Dict[str, SubjectRanking] = {}
+
+    def subject(self, name: str) -> SubjectRanking:
+        ranking = self.subjects.get(name)
+        if ranking is None:
+            ranking = self.subjects[name] = SubjectRanking(name)
+        return ranking
+
+    def add_semester(self, student: Hashable, semester: Semester):
+        """Rank every subject of a student's semester"""
+        for subject in semester.subjects:
+            self.subject(subject.name).add(student, subject)
+
+    def remove_student(self, student: Hashable):
+        for ranking in self.subjects.values():
+            if student in ranking:
+                ranking.remove(student)
+
+    def rank(self, student: Hashable, subject: str, metric: str = "relative_performance") -> int:
+        return self.subjects[subject].rank(student, metric)
+
+    def percentile(self, student: Hashable, subject: str, metric: str = "relative_performance") -> float:
+        return self.subjects[subject].percentile(student, metric)
+
+    def rank_summary(self, student: Hashable, semester_summary: Dict) -> Dict:
+        """Copy of a generate_semester_summary result with a "standing" entry per ranked subject"""
+        subjects = []
+        for subject in semester_summary["subjects"]:
+            ranking = self.subjects.get(subject["name"])
+            if ranking is not None and student in ranking:
+                subject = {**subject, "standing": ranking.standing(student)}
+            subjects.append(subject)
+        return {**semester_summary, "subjects": subjects}
+
+    def as_dict(self) -> Dict:
+        """Every student's standing in every subject"""
+        return {
+            name: {str(student): ranking.standing(student) for student in ranking._subjects}
+            for name, ranking in self.subjects.items()
+        }
+
+
+def rank_semesters(records: Iterable[Dict], grade_scale: GradeScale) -> Iterator[Dict]:
+    """Summaries of semester records with a "student" key, with every subject's standing added.
+
+    All records are ranked before the first summary is produced, so the whole
+    cohort is held in memory.
+    """
+    ranking = CohortRanking()
+    students = []
+    for record in records:
+        student = record["student"]
+        semester = semester_from_dict(record)
+        ranking.add_semester(student, semester)
+        students.append((student, semester))
+    for student, semester in students:
+        yield {"student": student, **ranking.rank_summary(student, generate_semester_summary(semester, grade_scale))}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Add each subject's rank and percentile to semester summaries.")
+    parser.add_argument("input", nargs="?", default="-",
+                        help='semesters as JSON Lines with a "student" key (default: stdin)')
+    parser.add_argument("-o", "--output", default="-", help="output JSONL file (default: stdout)")
+    parser.add_argument("--grade-scale", default=None,
+                        help='JSON file mapping thresholds to [grade, points], e.g. {"0.2": ["A", 4.0]}')
+    args = parser.parse_args(argv)
+
+    if args.grade_scale:
+        with open(args.grade_scale, encoding="utf-8") as f:
+            grade_scale = grade_scale_from_dict(json.load(f))
+    else:
+        grade_scale = create_default_grade_scale()
+
+    input_stream = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    output_stream = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        records = (json.loads(line) for _, line in iter_records(input_stream))
+        for summary in rank_semesters(records, grade_scale):
+            output_stream.write(json.dumps(summary, separators=(",", ":")) + "\n")
+    except (ValueError, TypeError, KeyError) as e:
+        print(f"Failed to rank semesters: {type(e).__name__}: {e}", file=sys.stderr)
+        return 1
+    finally:
+        for stream in (input_stream, output_stream):
+            if stream not in (sys.stdin, sys.stdout):
+                stream.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
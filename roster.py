@@ -0,0 +1,307 @@
+"""Class averages computed from raw per-student rosters.
+
+A roster is a delimited file with one row per student per component:
+
+    Student, Semester, Subject, Credits, Component, Weight, Max, Marks
+
+Semester and Credits are optional. The roster is read twice and never held in
+memory. The first pass keeps running statistics per (semester, subject,
+component) with Welford's online update. The second pass gives every student
+the leave-one-out class average of each component, i.e. the mean of everyone
+else's marks, computed in O(1) from the totals of the first pass.
+
+Usage: python roster.py ROSTER [-o OUTPUT] [--filled]
+
+writes one semester per student as JSON Lines for main.py --batch, or with
+--filled the roster itself with a Class Avg column added.
+"""
+import argparse
+import csv
+import json
+import math
+import sys
+from dataclasses import dataclass
+from itertools import groupby
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from models import Component, Subject, Semester
+from batch import semester_to_dict
+
+# Header names are matched case-insensitively; Semester and Credits may be left out
+STUDENT_COLUMN = "Student"
+SEMESTER_COLUMN = "Semester"
+SUBJECT_COLUMN = "Subject"
+CREDITS_COLUMN = "Credits"
+COMPONENT_COLUMN = "Component"
+WEIGHT_COLUMN = "Weight"
+MAX_COLUMN = "Max"
+MARKS_COLUMN = "Marks"
+CLASS_AVG_COLUMN = "Class Avg"
+
+REQUIRED_COLUMNS = (STUDENT_COLUMN, SUBJECT_COLUMN, COMPONENT_COLUMN, WEIGHT_COLUMN, MAX_COLUMN, MARKS_COLUMN)
+
+DEFAULT_CREDIT_HOURS = 3.0
+
+# (semester, subject, component)
+ComponentKey = Tuple[str, str, str]
+
+
+@dataclass
+class RosterMark:
+    """One student's marks in one component"""
+    line: int
+    student: str
+    semester: str
+    subject: str
+    credit_hours: float
+    component: str
+    weight: float
+    max_marks: float
+    marks: float
+
+    @property
+    def key(self) -> ComponentKey:
+        return self.semester, self.subject, self.component
+
+
+class RunningStats:
+    """Count, mean, variance, min and max updated one value at a time (Welford)"""
+    __slots__ = ("count", "mean", "_m2", "min", "max", "total")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0  # Sum of squared differences from the mean
+        self.min = math.inf
+        self.max = -math.inf
+        self.total = 0.0
+
+    def add(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    @property
+    def variance(self) -> float:
+        """Population variance of the marks seen so far"""
+        return self._m2 / self.count if self.count else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    def mean_without(self, value: float) -> float:
+        """Mean of the other values once one occurrence of value is left out.
+
+        With only one value there is nobody else to compare with, so the value
+        itself is returned and the relative performance comes out as zero.
+        """
+        if self.count <= 1:
+            return value
+        return (self.total - value) / (self.count - 1)
+
+    def as_dict(self) -> Dict:
+        return {"count": self.count, "mean": self.mean, "std": self.std, "min": self.min, "max": self.max}
+
+
+def _normalize(name: str) -> str:
+    return " ".join(name.split()).lower()
+
+
+def read_roster(stream: TextIO, delimiter: str = ",",
+                default_credit_hours: float = DEFAULT_CREDIT_HOURS) -> Iterator[RosterMark]:
+    """Yield the marks of a roster one row at a time, validating each row"""
+    reader = csv.reader(stream, delimiter=delimiter)
+    header = next(reader, None)
+    if header is None:
+        return
+    positions = {_normalize(name): i for i, name in enumerate(header)}
+    missing = [column for column in REQUIRED_COLUMNS if _normalize(column) not in positions]
+    if missing:
+        raise ValueError(f"Roster is missing the column {missing[0]!r}")
+    index = lambda column: positions.get(_normalize(column))
+    student, subject, component = index(STUDENT_COLUMN), index(SUBJECT_COLUMN), index(COMPONENT_COLUMN)
+    weight, max_index, marks = index(WEIGHT_COLUMN), index(MAX_COLUMN), index(MARKS_COLUMN)
+    semester, credits = index(SEMESTER_COLUMN), index(CREDITS_COLUMN)
+
+    for line_number, row in enumerate(reader, 2):
+        if not any(cell.strip() for cell in row):
+            continue
+        if len(row) < len(header):
+            raise ValueError(f"Line {line_number}: expected {len(header)} fields, found {len(row)}.")
+        try:
+            mark = RosterMark(
+                line_number,
+                row[student].strip(),
+                row[semester].strip() if semester is not None else "",
+                row[subject].strip(),
+                float(row[credits]) if credits is not None else default_credit_hours,
+                row[component].strip(),
+                float(row[weight]),
+                float(row[max_index]),
+                float(row[marks])
+            )
+        except ValueError:
+            raise ValueError(f"Line {line_number}: invalid number.") from None
+        # Same rules as ComponentDialog
+        if mark.max_marks <= 0:
+            raise ValueError(f"Line {line_number}: maximum marks must be greater than zero.")
+        if not 0 <= mark.marks <= mark.max_marks:
+            raise ValueError(f"Line {line_number}: marks must be between 0 and {mark.max_marks}.")
+        yield mark
+
+
+def roster_statistics(marks: Iterable[RosterMark], grouped: bool = False) -> Dict[ComponentKey, RunningStats]:
+    """First pass: running statistics of every component, in order of first appearance.
+
+    With grouped=True, also check that each student's rows are consecutive, as
+    student_semesters needs, so an unsorted roster fails before any output.
+    """
+    stats: Dict[ComponentKey, RunningStats] = {}
+    finished, current = set(), None
+    for mark in marks:
+        if grouped and mark.student != current:
+            if mark.student in finished:
+                raise ValueError(f"Line {mark.line}: rows of student {mark.student!r} are not consecutive; "
+                                 f"sort the roster by student.")
+            if current is not None:
+                finished.add(current)
+            current = mark.student
+        component_stats = stats.get(mark.key)
+        if component_stats is None:
+            component_stats = stats[mark.key] = RunningStats()
+        component_stats.add(mark.marks)
+    return stats
+
+
+def class_averages(marks: Iterable[RosterMark],
+                   stats: Dict[ComponentKey, RunningStats]) -> Iterator[Tuple[RosterMark, float]]:
+    """Second pass: pair every mark with its leave-one-out class average"""
+    for mark in marks:
+        yield mark, stats[mark.key].mean_without(mark.marks)
+
+
+def student_semesters(marks: Iterable[RosterMark],
+                      stats: Dict[ComponentKey, RunningStats]) -> Iterator[Tuple[str, Semester]]:
+    """Second pass: build each student's semesters with class_avg_marks filled in.
+
+    The rows of one student must be consecutive, as in a roster sorted by
+    student; subjects and components keep their roster order. Only one
+    student's rows are held at a time.
+    """
+    finished = set()
+    for student, rows in groupby(class_averages(marks, stats), key=lambda item: item[0].student):
+        if student in finished:
+            raise ValueError(f"Rows of student {student!r} are not consecutive; sort the roster by student.")
+        finished.add(student)
+
+        # semester -> subject -> (credit hours, components); models are built once complete
+        semesters: Dict[str, Dict[str, Tuple[float, List[Component]]]] = {}
+        for mark, class_avg in rows:
+            subjects = semesters.setdefault(mark.semester, {})
+            subject = subjects.get(mark.subject)
+            if subject is None:
+                subject = subjects[mark.subject] = (mark.credit_hours, [])
+            subject[1].append(Component(mark.component, mark.weight, mark.max_marks, mark.marks, class_avg))
+        for name, subjects in semesters.items():
+            yield student, Semester(name, [
+                Subject(subject, credit_hours, components) for subject, (credit_hours, components) in subjects.items()
+            ])
+
+
+def read_roster_file(path: str, delimiter: str = ",",
+                     default_credit_hours: float = DEFAULT_CREDIT_HOURS) -> Iterator[RosterMark]:
+    """read_roster on a file path; the file is closed once the iterator is exhausted"""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        yield from read_roster(f, delimiter, default_credit_hours)
+
+
+def roster_file_semesters(path: str, delimiter: str = ",",
+                          default_credit_hours: float = DEFAULT_CREDIT_HOURS
+                          ) -> Tuple[Dict[ComponentKey, RunningStats], Iterator[Tuple[str, Semester]]]:
+    """Run the statistics pass over a roster file and return them with the lazy second pass.
+
+    Rows must be grouped by student; this is checked in the statistics pass.
+    """
+    stats = roster_statistics(read_roster_file(path, delimiter, default_credit_hours), grouped=True)
+    return stats, student_semesters(read_roster_file(path, delimiter, default_credit_hours), stats)
+
+
+def write_filled_roster(path: str, output: TextIO, delimiter: str = ",",
+                        default_credit_hours: float = DEFAULT_CREDIT_HOURS,
+                        stats: Optional[Dict[ComponentKey, RunningStats]] = None) -> Dict[ComponentKey, RunningStats]:
+    """Copy a roster in any row order to output with a Class Avg column appended.
+
+    stats from an earlier roster_statistics pass over the same file saves reading it again.
+    """
+    if stats is None:
+        stats = roster_statistics(read_roster_file(path, delimiter, default_credit_hours))
+    averages = class_averages(read_roster_file(path, delimiter, default_credit_hours), stats)
+    writer = csv.writer(output, delimiter=delimiter, lineterminator="\n")
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f, delimiter=delimiter)
+        header = next(reader, None)
+        if header is None:
+            return stats
+        writer.writerow(header + [CLASS_AVG_COLUMN])
+        # Blank rows are skipped by read_roster too, so both readers stay in step
+        for row in reader:
+            if any(cell.strip() for cell in row):
+                _, class_avg = next(averages)
+                writer.writerow(row + [repr(class_avg)])
+    return stats
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Fill in class averages from a per-student roster.")
+    parser.add_argument("roster", help="roster file with one row per student per component")
+    parser.add_argument("-o", "--output", default="-", help="output file (default: stdout)")
+    parser.add_argument("--filled", action="store_true",
+                        help="write the roster with a Class Avg column instead of semesters as JSON Lines")
+    parser.add_argument("--delimiter", default=",", help="field delimiter (default: ,)")
+    parser.add_argument("--credits", type=float, default=DEFAULT_CREDIT_HOURS,
+                        help=f"credit hours when the roster has no Credits column (default: {DEFAULT_CREDIT_HOURS})")
+    parser.add_argument("--stats", default=None, help="also write the per-component statistics to this JSON file")
+    args = parser.parse_args(argv)
+
+    # The statistics pass validates the whole roster before the output file is created
+    try:
+        if args.filled:
+            stats = roster_statistics(read_roster_file(args.roster, args.delimiter, args.credits))
+        else:
+            stats, semesters = roster_file_semesters(args.roster, args.delimiter, args.credits)
+    except (OSError, ValueError) as e:
+        print(f"Failed to process roster: {e}", file=sys.stderr)
+        return 1
+
+    output = sys.stdout if args.output == "-" else open(args.output, "w", newline="", encoding="utf-8")
+    try:
+        if args.filled:
+            write_filled_roster(args.roster, output, args.delimiter, args.credits, stats)
+        else:
+            for student, semester in semesters:
+                output.write(json.dumps({"student": student, **semester_to_dict(semester)}) + "\n")
+    except (OSError, ValueError) as e:
+        print(f"Failed to process roster: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    if args.stats:
+        with open(args.stats, "w", encoding="utf-8") as f:
+            json.dump([
+                {"semester": semester, "subject": subject, "component": component, **component_stats.as_dict()}
+                for (semester, subject, component), component_stats in stats.items()
+            ], f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
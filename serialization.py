@@ -0,0 +1,108 @@
+import json
+from typing import Callable, Dict, List
+
+# Key order of a component entry in generate_subject_summary
+COMPONENT_FIELDS = [
+    "name", "weight", "my_marks", "max_marks", "class_avg_marks",
+    "my_percentage", "class_avg_percentage", "weighted_my_score",
+    "weighted_class_avg", "relative_performance", "relative_performance_percentage"
+]
+
+# Write buffer for JSON Lines output, which is written one summary at a time
+WRITE_BUFFER_SIZE = 1 << 20
+
+
+def _encode_json(data, compact: bool) -> bytes:
+    if compact:
+        text = json.dumps(data, separators=(",", ":"))
+    else:
+        text = json.dumps(data, indent=2)
+    return text.encode("utf-8")
+
+
+def _encode_orjson(data, compact: bool) -> bytes:
+    import orjson
+    return orjson.dumps(data) if compact else orjson.dumps(data, option=orjson.OPT_INDENT_2)
+
+
+# Encoders take (data, compact) and return UTF-8 bytes
+BACKENDS: Dict[str, Callable] = {
+    "json": _encode_json,
+    "orjson": _encode_orjson,
+}
+
+
+def register_backend(name: str, encoder: Callable):
+    """Make another encoder available by name"""
+    BACKENDS[name] = encoder
+
+
+def resolve_backend(backend: str = "auto") -> Callable:
+    """Look up an encoder; "auto" prefers orjson when it is installed"""
+    if backend == "auto":
+        try:
+            import orjson  # noqa: F401
+            return BACKENDS["orjson"]
+        except ImportError:
+            return BACKENDS["json"]
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown serializer backend: {backend}")
+    return BACKENDS[backend]
+
+
+def tabulate_components(semester_summary: Dict) -> Dict:
+    """Copy of a semester summary with each subject's components as a header plus rows"""
+    subjects = []
+    for subject in semester_summary["subjects"]:
+        subject = dict(subject)
+        subject["components"] = {
+            "fields": COMPONENT_FIELDS,
+            "rows": [[comp[key] for key in COMPONENT_FIELDS] for comp in subject["components"]]
+        }
+        subjects.append(subject)
+    return {**semester_summary, "subjects": subjects}
+
+
+def expand_components(semester_summary: Dict) -> Dict:
+    """Inverse of tabulate_components"""
+    subjects = []
+    for subject in semester_summary["subjects"]:
+        subject = dict(subject)
+        table = subject["components"]
+        if isinstance(table, dict):
+            subject["components"] = [dict(zip(table["fields"], row)) for row in table["rows"]]
+        subjects.append(subject)
+    return {**semester_summary, "subjects": subjects}
+
+
+def encode_summary(semester_summary: Dict, compact: bool = True, tabular: bool = False,
+                   backend: str = "auto") -> bytes:
+    """Serialize a semester summary to UTF-8 JSON bytes"""
+    if tabular:
+        semester_summary = tabulate_components(semester_summary)
+    return resolve_backend(backend)(semester_summary, compact)
+
+
+def dumps_summary(semester_summary: Dict, compact: bool = True, tabular: bool = False,
+                  backend: str = "auto") -> str:
+    return encode_summary(semester_summary, compact, tabular, backend).decode("utf-8")
+
+
+def write_summary(semester_summary: Dict, filename: str, compact: bool = False,
+                  tabular: bool = False, backend: str = "auto"):
+    """Write a semester summary to a file, encoded in full before the file is opened"""
+    data = encode_summary(semester_summary, compact, tabular, backend)
+    with open(filename, "wb") as f:
+        f.write(data)
+
+
+def write_summaries(summaries: List[Dict], filename: str, tabular: bool = False,
+                    backend: str = "auto"):
+    """Write many summaries as compact JSON Lines"""
+    encoder = resolve_backend(backend)
+    with open(filename, "wb", buffering=WRITE_BUFFER_SIZE) as f:
+        for summary in summaries:
+            if tabular:
+                summary = tabulate_components(summary)
+            f.write(encoder(summary, True))
+            f.write(b"\n")
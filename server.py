@@ -0,0 +1,240 @@
+"""Local HTTP/JSON service for semester summaries and grade prediction.
+
+Endpoints (all JSON, HTTP/1.1 keep-alive):
+
+    GET  /health     {"status": "ok", "cache": {...}}
+    POST /summaries  {"semesters": [<semester>, ...], "grade_scale": {...}?, "tabular": false?}
+                     -> {"summaries": [<summary or null>, ...], "errors": [{"index", "error"}, ...]}
+    POST /predict    {"relative_performance": [<float>, ...], "grade_scale": {...}?}
+                     -> {"grades": [[<grade>, <points>], ...]}
+    POST /rankings   {"semesters": [<semester with a "student" key>, ...]}
+                     -> {"ranked": <count>, "errors": [{"index", "error"}, ...]}
+    POST /standing   {"student": <id>, "subject": <name>?}
+                     -> {"subjects": {<name>: <standing>, ...}}
+
+Semesters use the same shape as the batch mode input. Without a grade_scale
+the server's default scale is used; its compiled form and the summary cache are
+shared by every request. /rankings adds students to a cohort ranking kept for
+the life of the server; posting a student again updates their standing.
+"""
+import argparse
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+from models import GradeScale
+from calculator import create_default_grade_scale
+from batch import RECORD_ERRORS, grade_scale_from_dict, semester_from_dict
+from cache import DEFAULT_CACHE_SIZE, SummaryCache
+from ranking import CohortRanking
+from serialization import resolve_backend, tabulate_components
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# Request bodies above this size are refused
+MAX_BODY_BYTES = 64 << 20
+
+# Custom grade scales kept compiled between requests, keyed by their JSON
+SCALE_CACHE_SIZE = 32
+
+
+class GradeService:
+    """The request handling logic, independent of HTTP"""
+    def __init__(self, grade_scale: Optional[GradeScale] = None, cache_size: int = DEFAULT_CACHE_SIZE,
+                 backend: str = "auto"):
+        self.grade_scale = grade_scale or create_default_grade_scale()
+        self.grade_scale.compile()
+        self.cache = SummaryCache(cache_size)
+        self.encode = resolve_backend(backend)
+        self._scales: Dict[str, GradeScale] = {}
+        self._scales_lock = threading.Lock()
+        self.ranking = CohortRanking()
+        self._ranking_lock = threading.Lock()
+
+    def _grade_scale(self, payload: Dict) -> GradeScale:
+        data = payload.get("grade_scale")
+        if data is None:
+            return self.grade_scale
+        key = json.dumps(data, sort_keys=True)
+        with self._scales_lock:
+            grade_scale = self._scales.get(key)
+        if grade_scale is None:
+            grade_scale = grade_scale_from_dict(data)
+            grade_scale.compile()
+            with self._scales_lock:
+                if len(self._scales) >= SCALE_CACHE_SIZE:
+                    self._scales.pop(next(iter(self._scales)))
+                self._scales[key] = grade_scale
+        return grade_scale
+
+    def summaries(self, payload: Dict) -> Dict:
+        grade_scale = self._grade_scale(payload)
+        tabular = bool(payload.get("tabular", False))
+        summaries, errors = [], []
+        for index, record in enumerate(payload["semesters"]):
+            try:
+                summary = self.cache.semester_summary(semester_from_dict(record), grade_scale)
+            except RECORD_ERRORS as e:
+                summaries.append(None)
+                errors.append({"index": index, "error": f"{type(e).__name__}: {e}"})
+                continue
+            summaries.append(tabulate_components(summary) if tabular else summary)
+        return {"summaries": summaries, "errors": errors}
+
+    def predict(self, payload: Dict) -> Dict:
+        grade_scale = self._grade_scale(payload)
+        values = [float(value) for value in payload["relative_performance"]]
+        return {"grades": [list(grade) for grade in grade_scale.predict_many(values)]}
+
+    def rankings(self, payload: Dict) -> Dict:
+        semesters, errors = [], []
+        for index, record in enumerate(payload["semesters"]):
+            try:
+                if not isinstance(record, dict) or "student" not in record:
+                    raise KeyError("student")
+                semesters.append((str(record["student"]), semester_from_dict(record)))
+            except RECORD_ERRORS as e:
+                errors.append({"index": index, "error": f"{type(e).__name__}: {e}"})
+        with self._ranking_lock:
+            for student, semester in semesters:
+                self.ranking.add_semester(student, semester)
+        return {"ranked": len(semesters), "errors": errors}
+
+    def standing(self, payload: Dict) -> Dict:
+        student = str(payload["student"])
+        subject = payload.get("subject")
+        with self._ranking_lock:
+            if subject is not None:
+                rankings = [self.ranking.subjects[str(subject)]]
+            else:
+                rankings = [ranking for ranking in self.ranking.subjects.values() if student in ranking]
+            return {"subjects": {ranking.name: ranking.standing(student) for ranking in rankings}}
+
+    def health(self) -> Dict:
+        return {"status": "ok", "cache": {"entries": len(self.cache), "hits": self.cache.hits,
+                                          "misses": self.cache.misses}}
+
+
+class _RequestError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class GradeRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive by default
+    server_version = "GradeService/1.0"
+
+    POST_ROUTES = {"/summaries": GradeService.summaries, "/predict": GradeService.predict,
+                   "/rankings": GradeService.rankings, "/standing": GradeService.standing}
+
+    def _send_json(self, status: int, data) -> None:
+        body = self.server.service.encode(data, True)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self) -> Dict:
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            # Without a usable length the body cannot be skipped, and read(-1) would block
+            self.close_connection = True
+            raise _RequestError(400, "Invalid Content-Length header")
+        if length > MAX_BODY_BYTES:
+            # The unread body makes the connection unusable
+            self.close_connection = True
+            raise _RequestError(413, "Request body too large")
+        body = self.rfile.read(length)
+        try:
+            payload = json.loads(body)
+        except ValueError as e:
+            raise _RequestError(400, f"Invalid JSON: {e}")
+        if not isinstance(payload, dict):
+            raise _RequestError(400, "Request body must be a JSON object")
+        return payload
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, self.server.service.health())
+        else:
+            self._send_json(404, {"error": f"No such endpoint: {self.path}"})
+
+    def do_POST(self):
+        try:
+            payload = self._read_json()
+            route = self.POST_ROUTES.get(self.path)
+            if route is None:
+                raise _RequestError(404, f"No such endpoint: {self.path}")
+            try:
+                result = route(self.server.service, payload)
+            except RECORD_ERRORS as e:
+                raise _RequestError(400, f"{type(e).__name__}: {e}")
+        except _RequestError as e:
+            self._send_json(e.status, {"error": e.message})
+            return
+        except Exception as e:
+            # Keep the connection and answer, rather than letting the handler drop it
+            self.log_error("Error handling %s: %s: %s", self.path, type(e).__name__, e)
+            self._send_json(500, {"error": f"Internal error: {type(e).__name__}"})
+            return
+        self._send_json(200, result)
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+class GradeServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], service: GradeService, quiet: bool = False):
+        super().__init__(address, GradeRequestHandler)
+        self.service = service
+        self.quiet = quiet
+
+
+def run_server_cli(argv=None) -> int:
+    """Run the HTTP service until interrupted; returns the process exit status"""
+    parser = argparse.ArgumentParser(
+        prog="main.py --serve",
+        description="Serve semester summaries and grade predictions over HTTP/JSON."
+    )
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"address to bind (default: {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"port to listen on (default: {DEFAULT_PORT})")
+    parser.add_argument("--grade-scale", default=None,
+                        help='JSON file mapping thresholds to [grade, points], e.g. {"0.2": ["A", 4.0]}')
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_CACHE_SIZE,
+                        help=f"summaries kept in the shared cache (default: {DEFAULT_CACHE_SIZE})")
+    parser.add_argument("--serializer", default="auto", choices=["auto", "json", "orjson"],
+                        help="JSON encoder backend (default: orjson if installed, else json)")
+    parser.add_argument("--quiet", action="store_true", help="do not log each request")
+    args = parser.parse_args(argv)
+
+    grade_scale = None
+    if args.grade_scale:
+        with open(args.grade_scale, encoding="utf-8") as f:
+            grade_scale = grade_scale_from_dict(json.load(f))
+
+    server = GradeServer((args.host, args.port), GradeService(grade_scale, args.cache_size, args.serializer),
+                         quiet=args.quiet)
+    print(f"Serving on http://{args.host}:{server.server_port}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run_server_cli())
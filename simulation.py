@@ -0,0 +1,159 @@
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from models import GradeScale, Subject, Semester
+
+# Samples drawn per batch; bounds memory for very large sample counts
+DEFAULT_CHUNK_SIZE = 1 << 18
+
+
+@dataclass
+class UncertainMarks:
+    """Normal distributions for a component's marks, clipped to [0, max_marks].
+
+    A mean of None uses the value entered on the component; a std of 0 keeps
+    that value fixed.
+    """
+    my_std: float = 0.0
+    class_avg_std: float = 0.0
+    my_mean: Optional[float] = None
+    class_avg_mean: Optional[float] = None
+
+
+@dataclass
+class SubjectSimulation:
+    name: str
+    grades: List[tuple]  # (grade_letter, grade_points), best grade first
+    probabilities: List[float]  # Probability of each grade in `grades`
+
+    def as_dict(self) -> Dict[str, float]:
+        return {letter: p for (letter, _), p in zip(self.grades, self.probabilities)}
+
+
+@dataclass
+class SemesterSimulation:
+    n_samples: int
+    subjects: List[SubjectSimulation]
+    sgpa: Dict[float, float]  # SGPA value -> probability
+    sgpa_mean: float
+    sgpa_std: float
+    cgpa: Optional[Dict[float, float]] = None  # None without previous CGPA data
+    cgpa_mean: Optional[float] = None
+    cgpa_std: Optional[float] = None
+
+
+class _SubjectSampler:
+    """A subject's fixed contributions precomputed, so each batch only samples the unknowns"""
+    def __init__(self, subject: Subject, uncertain: Dict[str, UncertainMarks]):
+        unknown = set(uncertain)
+        missing = unknown - {comp.name for comp in subject.components}
+        if missing:
+            raise ValueError(f"No component named {sorted(missing)[0]!r} in {subject.name}")
+
+        self.known_my = sum(comp.weighted_my_score for comp in subject.components if comp.name not in unknown)
+        self.known_class = sum(comp.weighted_class_avg for comp in subject.components if comp.name not in unknown)
+
+        sampled = [comp for comp in subject.components if comp.name in unknown]
+        spec = [uncertain[comp.name] for comp in sampled]
+        self.max_marks = np.array([comp.max_marks for comp in sampled], dtype=np.float64)
+        self.scale = np.array([comp.weight for comp in sampled], dtype=np.float64) / self.max_marks
+        self.my_mean = np.array([comp.my_marks if s.my_mean is None else s.my_mean
+                                 for comp, s in zip(sampled, spec)], dtype=np.float64)
+        self.my_std = np.array([s.my_std for s in spec], dtype=np.float64)
+        self.class_mean = np.array([comp.class_avg_marks if s.class_avg_mean is None else s.class_avg_mean
+                                    for comp, s in zip(sampled, spec)], dtype=np.float64)
+        self.class_std = np.array([s.class_avg_std for s in spec], dtype=np.float64)
+
+    def relative_performance(self, rng: np.random.Generator, n: int) -> np.ndarray:
+        """Sample n overall relative performances"""
+        shape = (n, len(self.max_marks))
+        my_marks = np.clip(rng.normal(self.my_mean, self.my_std, shape), 0, self.max_marks)
+        class_marks = np.clip(rng.normal(self.class_mean, self.class_std, shape), 0, self.max_marks)
+        weighted_my = self.known_my + my_marks @ self.scale
+        weighted_class = self.known_class + class_marks @ self.scale
+
+        relative = np.zeros(n)
+        np.divide(weighted_my - weighted_class, weighted_class, out=relative, where=weighted_class != 0)
+        return relative
+
+
+def _value_distribution(counts: Dict[float, int], n: int):
+    """Probabilities, mean and standard deviation of a discrete sample"""
+    values = np.array(sorted(counts))
+    weights = np.array([counts[v] for v in values], dtype=np.float64) / n
+    mean = float(values @ weights)
+    std = float(np.sqrt(((values - mean) ** 2) @ weights))
+    return {float(v): float(w) for v, w in zip(values, weights)}, mean, std
+
+
+def _add_counts(counts: Dict[float, int], samples: np.ndarray):
+    values, value_counts = np.unique(samples, return_counts=True)
+    for value, count in zip(values.tolist(), value_counts.tolist()):
+        counts[value] = counts.get(value, 0) + count
+
+
+def simulate_semester(semester: Semester, grade_scale: GradeScale,
+                      uncertain: Dict[str, Dict[str, UncertainMarks]], n_samples: int = 1_000_000,
+                      seed: Optional[int] = None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> SemesterSimulation:
+    """Monte Carlo distribution of grades, SGPA and CGPA.
+
+    uncertain maps subject name -> component name -> UncertainMarks; every other
+    mark is taken as entered. Samples are drawn in batches of chunk_size, each
+    evaluated for all subjects at once with array operations.
+    """
+    compiled = grade_scale.compile()
+    points = np.array([p for _, p in compiled.grades], dtype=np.float64)
+    thresholds = np.asarray(compiled.thresholds, dtype=np.float64)
+    rng = np.random.default_rng(seed)
+
+    samplers = [_SubjectSampler(subject, uncertain.get(subject.name, {})) for subject in semester.subjects]
+    credits = np.array([subject.credit_hours for subject in semester.subjects], dtype=np.float64)
+    total_credits = semester.total_credits
+    has_previous = semester.previous_cgpa is not None and semester.previous_credits is not None
+
+    grade_counts = np.zeros((len(samplers), len(points)), dtype=np.int64)
+    sgpa_counts: Dict[float, int] = {}
+    cgpa_counts: Dict[float, int] = {}
+
+    for start in range(0, n_samples, chunk_size):
+        n = min(chunk_size, n_samples - start)
+        credit_points = np.zeros(n)
+        for i, sampler in enumerate(samplers):
+            relative = sampler.relative_performance(rng, n)
+            # Same lookup as CompiledGradeScale.grade_indices
+            index = np.searchsorted(thresholds, relative, side="right") - 1
+            index[(index < 0) | np.isnan(relative)] = 0
+            grade_counts[i] += np.bincount(index, minlength=len(points))
+            credit_points += points[index] * credits[i]
+
+        sgpa = credit_points / total_credits if total_credits else np.zeros(n)
+        _add_counts(sgpa_counts, sgpa)
+        if has_previous:
+            cgpa = ((semester.previous_cgpa * semester.previous_credits + sgpa * total_credits)
+                    / (semester.previous_credits + total_credits))
+            _add_counts(cgpa_counts, cgpa)
+
+    subjects = [
+        SubjectSimulation(
+            subject.name,
+            compiled.grades[::-1],
+            (grade_counts[i][::-1] / n_samples).tolist()
+        )
+        for i, subject in enumerate(semester.subjects)
+    ]
+    sgpa_dist, sgpa_mean, sgpa_std = _value_distribution(sgpa_counts, n_samples)
+    result = SemesterSimulation(n_samples, subjects, sgpa_dist, sgpa_mean, sgpa_std)
+    if has_previous:
+        result.cgpa, result.cgpa_mean, result.cgpa_std = _value_distribution(cgpa_counts, n_samples)
+    return result
+
+
+def simulate_subject(subject: Subject, grade_scale: GradeScale, uncertain: Dict[str, UncertainMarks],
+                     n_samples: int = 1_000_000, seed: Optional[int] = None,
+                     chunk_size: int = DEFAULT_CHUNK_SIZE) -> SubjectSimulation:
+    """Monte Carlo grade distribution for one subject"""
+    semester = Semester(subject.name, [subject])
+    return simulate_semester(semester, grade_scale, {subject.name: uncertain},
+                             n_samples, seed, chunk_size).subjects[0]
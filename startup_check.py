@@ -0,0 +1,70 @@
+"""Measure start-up cost of the headless entry points against a fixed budget.
+
+Usage: python startup_check.py [--runs N]
+
+Each mode is imported in a fresh interpreter, the median import time is
+compared with its budget, and the check fails if a GUI or array library was
+pulled in. Exit status is 1 when any mode is over budget.
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+# Milliseconds spent importing an entry point, on top of bare interpreter start-up
+STARTUP_BUDGET_MS = {
+    "--cli": 75.0,
+    "--batch": 90.0,
+    "--serve": 110.0,
+}
+
+# Modules a headless entry point must never import
+FORBIDDEN_MODULES = ("tkinter", "gui", "numpy", "concurrent.futures")
+
+_PROBE = (
+    "import sys, time\n"
+    "start = time.perf_counter()\n"
+    "import main\n"
+    "main.load_entry_point({mode!r})\n"
+    "elapsed = (time.perf_counter() - start) * 1000\n"
+    "print(elapsed)\n"
+    "print(' '.join(sorted(sys.modules)))\n"
+)
+
+
+def measure(mode: str):
+    """Return (import_ms, loaded_modules) for one fresh interpreter"""
+    output = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(mode=mode)],
+        capture_output=True, text=True, check=True
+    ).stdout.splitlines()
+    return float(output[0]), set(output[1].split())
+
+
+def check_startup(runs: int = 5) -> bool:
+    ok = True
+    print(f"{'Mode':<10} {'Median':>10} {'Budget':>10}  Result")
+    for mode, budget in STARTUP_BUDGET_MS.items():
+        timings = []
+        modules = set()
+        for _ in range(runs):
+            elapsed, modules = measure(mode)
+            timings.append(elapsed)
+        median = statistics.median(timings)
+        forbidden = [name for name in FORBIDDEN_MODULES if name in modules]
+
+        result = "ok"
+        if median > budget:
+            result = "over budget"
+        if forbidden:
+            result = "imports " + ", ".join(forbidden)
+        ok = ok and result == "ok"
+        print(f"{mode:<10} {median:>8.1f}ms {budget:>8.1f}ms  {result}")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check start-up time of the headless entry points.")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per mode (default: 5)")
+    args = parser.parse_args()
+    sys.exit(0 if check_startup(args.runs) else 1)
@@ -0,0 +1,238 @@
+import sqlite3
+from bisect import bisect_right
+from itertools import groupby, islice
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from models import Component, GradeScale, Subject, Semester, Transcript
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS students (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS semesters (
+    id INTEGER PRIMARY KEY,
+    student_id INTEGER NOT NULL REFERENCES students(id) ON DELETE CASCADE,
+    term INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    previous_cgpa REAL,
+    previous_credits REAL,
+    UNIQUE (student_id, term)
+);
+CREATE TABLE IF NOT EXISTS subjects (
+    id INTEGER PRIMARY KEY,
+    semester_id INTEGER NOT NULL REFERENCES semesters(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    credit_hours REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS components (
+    id INTEGER PRIMARY KEY,
+    subject_id INTEGER NOT NULL REFERENCES subjects(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    weight REAL NOT NULL,
+    max_marks REAL NOT NULL,
+    my_marks REAL NOT NULL,
+    class_avg_marks REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_semesters_term ON semesters(term);
+CREATE INDEX IF NOT EXISTS idx_subjects_semester ON subjects(semester_id, position);
+CREATE INDEX IF NOT EXISTS idx_subjects_name ON subjects(name);
+CREATE INDEX IF NOT EXISTS idx_components_subject ON components(subject_id, position);
+"""
+
+# Semesters written per transaction by bulk_insert
+DEFAULT_BATCH_SIZE = 500
+
+_SEMESTER_ROWS = """
+SELECT sem.id, sem.term, sem.name, sem.previous_cgpa, sem.previous_credits,
+       sub.id, sub.name, sub.credit_hours,
+       comp.name, comp.weight, comp.max_marks, comp.my_marks, comp.class_avg_marks
+FROM semesters sem
+LEFT JOIN subjects sub ON sub.semester_id = sem.id
+LEFT JOIN components comp ON comp.subject_id = sub.id
+WHERE sem.student_id = ? {where}
+ORDER BY sem.term, sub.position, comp.position
+"""
+
+
+class GradebookStore:
+    """SQLite repository of students and their semesters, one row per term.
+
+    A student's terms are ordered by an integer term number. previous_cgpa and
+    previous_credits are only kept as the starting point of the earliest stored
+    term (e.g. credits transferred in); for later terms they are derived from
+    the stored history.
+    """
+    def __init__(self, path: str = ":memory:"):
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _student_id(self, student: str, create: bool = False) -> Optional[int]:
+        row = self.connection.execute("SELECT id FROM students WHERE name = ?", (student,)).fetchone()
+        if row is not None:
+            return row[0]
+        if not create:
+            return None
+        return self.connection.execute("INSERT INTO students (name) VALUES (?)", (student,)).lastrowid
+
+    def students(self) -> List[str]:
+        return [name for (name,) in self.connection.execute("SELECT name FROM students ORDER BY name")]
+
+    def terms(self, student: str) -> List[int]:
+        return [term for (term,) in self.connection.execute(
+            "SELECT term FROM semesters JOIN students ON students.id = semesters.student_id "
+            "WHERE students.name = ? ORDER BY term", (student,)
+        )]
+
+    def _next_ids(self) -> Dict[str, int]:
+        return {
+            table: self.connection.execute(f"SELECT COALESCE(MAX(id), 0) + 1 FROM {table}").fetchone()[0]
+            for table in ("semesters", "subjects", "components")
+        }
+
+    def _insert_batch(self, batch: List[Tuple[str, int, Semester]]):
+        """Write a batch of semesters with one executemany per table; ids are assigned here"""
+        # A term repeated within the batch keeps its last version
+        batch = list({(student, term): (student, term, semester) for student, term, semester in batch}.values())
+        ids = self._next_ids()
+        student_ids = {}
+        semester_rows, subject_rows, component_rows = [], [], []
+        for student, term, semester in batch:
+            if student not in student_ids:
+                student_ids[student] = self._student_id(student, create=True)
+            semester_id = ids["semesters"]
+            ids["semesters"] += 1
+            # Replacing a term removes its old subjects and components by cascade
+            self.connection.execute("DELETE FROM semesters WHERE student_id = ? AND term = ?",
+                                    (student_ids[student], term))
+            semester_rows.append((semester_id, student_ids[student], term, semester.name,
+                                  semester.previous_cgpa, semester.previous_credits))
+            for position, subject in enumerate(semester.subjects):
+                subject_id = ids["subjects"]
+                ids["subjects"] += 1
+                subject_rows.append((subject_id, semester_id, position, subject.name, subject.credit_hours))
+                component_rows.extend(
+                    (subject_id, i, comp.name, comp.weight, comp.max_marks, comp.my_marks, comp.class_avg_marks)
+                    for i, comp in enumerate(subject.components)
+                )
+
+        self.connection.executemany("INSERT INTO semesters VALUES (?, ?, ?, ?, ?, ?)", semester_rows)
+        self.connection.executemany("INSERT INTO subjects VALUES (?, ?, ?, ?, ?)", subject_rows)
+        self.connection.executemany(
+            "INSERT INTO components (subject_id, position, name, weight, max_marks, my_marks, class_avg_marks) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)", component_rows
+        )
+
+    def bulk_insert(self, records: Iterable[Tuple[str, int, Semester]],
+                    batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+        """Store (student, term, semester) records, batch_size per transaction.
+
+        An existing semester for the same student and term is replaced. Returns
+        the number of semesters written.
+        """
+        records = iter(records)
+        count = 0
+        while True:
+            batch = list(islice(records, batch_size))
+            if not batch:
+                return count
+            with self.connection:
+                self._insert_batch(batch)
+            count += len(batch)
+
+    def save_semester(self, student: str, term: int, semester: Semester):
+        """Store one semester, replacing any previous version of that term"""
+        self.bulk_insert([(student, term, semester)])
+
+    def delete_semester(self, student: str, term: int) -> bool:
+        with self.connection:
+            cursor = self.connection.execute(
+                "DELETE FROM semesters WHERE term = ? AND student_id = (SELECT id FROM students WHERE name = ?)",
+                (term, student)
+            )
+        return cursor.rowcount > 0
+
+    def _load(self, student: str, where: str = "", params: tuple = ()) -> List[Tuple[int, Semester]]:
+        """Rebuild (term, Semester) pairs for a student from one ordered join"""
+        student_id = self._student_id(student)
+        if student_id is None:
+            return []
+        rows = self.connection.execute(_SEMESTER_ROWS.format(where=where), (student_id,) + params)
+
+        semesters = []
+        for (_, term, name, previous_cgpa, previous_credits), semester_rows in groupby(rows, key=lambda r: r[:5]):
+            subjects = []
+            for (subject_id, subject_name, credit_hours), subject_rows in groupby(semester_rows, key=lambda r: r[5:8]):
+                if subject_id is None:
+                    continue  # Semester without subjects
+                subjects.append(Subject(subject_name, credit_hours, [
+                    Component(*row[8:]) for row in subject_rows if row[8] is not None
+                ]))
+            semesters.append((term, Semester(name, subjects, previous_cgpa, previous_credits)))
+        return semesters
+
+    def load_semester(self, student: str, term: int) -> Optional[Semester]:
+        """The semester exactly as stored, or None"""
+        semesters = self._load(student, "AND sem.term = ?", (term,))
+        return semesters[0][1] if semesters else None
+
+    def load_transcript(self, student: str, grade_scale: GradeScale) -> Tuple[List[int], Transcript]:
+        """A student's term numbers and a Transcript of their stored semesters"""
+        semesters = self._load(student)
+        if not semesters:
+            return [], Transcript(grade_scale)
+        first = semesters[0][1]
+        return [term for term, _ in semesters], Transcript(
+            grade_scale, [semester for _, semester in semesters], first.previous_cgpa, first.previous_credits
+        )
+
+    def load_history(self, student: str, grade_scale: GradeScale) -> List[Tuple[int, Semester]]:
+        """All of a student's terms in order, with previous CGPA and credits derived from earlier terms"""
+        terms, transcript = self.load_transcript(student, grade_scale)
+        for k, semester in enumerate(transcript):
+            points, credits = transcript.totals(k)
+            if credits:
+                semester.previous_cgpa = points / credits
+                semester.previous_credits = credits
+            else:
+                semester.previous_cgpa = semester.previous_credits = None
+        return list(zip(terms, transcript))
+
+    def cgpa(self, student: str, grade_scale: GradeScale, term: Optional[int] = None) -> Optional[float]:
+        """CGPA from stored history, as of term (inclusive) or over all terms; None for no data"""
+        terms, transcript = self.load_transcript(student, grade_scale)
+        count = bisect_right(terms, term) if term is not None else len(terms)
+        if count == 0:
+            return None
+        return transcript.cgpa(count - 1)
+
+    def find_subjects(self, name: str) -> List[Tuple[str, int, Subject]]:
+        """Every stored subject with this name as (student, term, subject)"""
+        rows = self.connection.execute("""
+            SELECT students.name, sem.term, sub.id, sub.credit_hours,
+                   comp.name, comp.weight, comp.max_marks, comp.my_marks, comp.class_avg_marks
+            FROM subjects sub
+            JOIN semesters sem ON sem.id = sub.semester_id
+            JOIN students ON students.id = sem.student_id
+            LEFT JOIN components comp ON comp.subject_id = sub.id
+            WHERE sub.name = ?
+            ORDER BY students.name, sem.term, sub.id, comp.position
+        """, (name,))
+        return [
+            (student, term, Subject(name, credit_hours, [
+                Component(*row[4:]) for row in subject_rows if row[4] is not None
+            ]))
+            for (student, term, _, credit_hours), subject_rows in groupby(rows, key=lambda r: r[:4])
+        ]
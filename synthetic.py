@@ -0,0 +1,53 @@
+import random
+from typing import Dict, List, Optional, Sequence
+
+from models import Component, Subject, Semester
+from presets import SUBJECT_PRESETS, expand_preset
+
+# Presets that define at least one component
+PRESET_NAMES = [name for name, components in SUBJECT_PRESETS.items() if components]
+
+MAX_MARKS_CHOICES = (10.0, 20.0, 25.0, 50.0, 100.0)
+
+
+def synthetic_component(rng: random.Random, name: str, weight: float) -> Component:
+    """A component with a plausible class average and a score scattered around it"""
+    max_marks = rng.choice(MAX_MARKS_CHOICES)
+    class_avg = round(rng.uniform(0.4, 0.8) * max_marks, 2)
+    my_marks = round(min(max(rng.gauss(class_avg, 0.15 * max_marks), 0.0), max_marks), 2)
+    return Component(name, weight, max_marks, my_marks, class_avg)
+
+
+def synthetic_subject(rng: random.Random, name: str, preset_name: str,
+                      group_counts: Optional[Dict[str, int]] = None) -> Subject:
+    """A subject whose components follow one of the SUBJECT_PRESETS templates"""
+    components = [
+        synthetic_component(rng, comp_name, weight)
+        for comp_name, weight in expand_preset(preset_name, group_counts)
+    ]
+    return Subject(name, float(rng.choice((1, 2, 3, 3, 4))), components)
+
+
+def synthetic_semester(rng: random.Random, name: str, subjects: int = 5,
+                       presets: Sequence[str] = PRESET_NAMES,
+                       group_counts: Optional[Dict[str, int]] = None,
+                       previous_ratio: float = 0.5) -> Semester:
+    """A semester of random subjects; previous_ratio of them carry previous CGPA data"""
+    semester = Semester(name, [
+        synthetic_subject(rng, f"Subject {i+1}", rng.choice(presets), group_counts)
+        for i in range(subjects)
+    ])
+    if rng.random() < previous_ratio:
+        semester.previous_cgpa = round(rng.uniform(2.0, 4.0), 2)
+        semester.previous_credits = float(rng.randrange(15, 120))
+    return semester
+
+
+def synthetic_cohort(size: int, subjects: int = 5, presets: Sequence[str] = PRESET_NAMES,
+                     group_counts: Optional[Dict[str, int]] = None, seed: int = 0) -> List[Semester]:
+    """A reproducible cohort of size semesters; the same seed always gives the same data"""
+    rng = random.Random(seed)
+    return [
+        synthetic_semester(rng, f"Student {i+1}", subjects, presets, group_counts)
+        for i in range(size)
+    ]